@@ -1,42 +1,107 @@
 import os
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pipeline_manifest import StageManifest
+
+# Bytes read per step while seeking back from EOF for the last newline.
+BLOCK_SIZE = 4096
+WORKERS = 8
 
 def remove_last_line(filepath):
     """
-    Opens the file at filepath, reads all lines,
-    and writes back all lines except the last one.
+    Drops the last line of the file at filepath in place: seeks backwards
+    from EOF to the newline that ends the previous line and truncates the
+    file there, so only the tail of the file is read whatever its size.
+    Returns True when the file was processed.
     """
     try:
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-        if not lines:
-            return  # nothing to do on an empty file
-
-        # Remove the last line
-        new_lines = lines[:-1]
-        
-        with open(filepath, 'w') as f:
-            f.writelines(new_lines)
-        
+        with open(filepath, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            if end == 0:
+                return True  # nothing to do on an empty file
+
+            # The newline that ends the last line belongs to it; skip it.
+            f.seek(end - 1)
+            position = end - 1 if f.read(1) == b'\n' else end
+            cut = 0
+            while position > 0:
+                step = min(BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b'\n')
+                if newline != -1:
+                    cut = position + newline + 1
+                    break
+            f.truncate(cut)
+
         print(f"Processed: {filepath}")
+        return True
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
+        return False
 
-def process_directory(root_dir):
+def process_directory(root_dir, force=False, use_hash=False, workers=WORKERS):
     """
-    Recursively walk through root_dir and process all .csv files.
+    Recursively walk through root_dir and process all .csv files on a thread pool.
+    Files already truncated by an earlier run (recorded in the stage manifest
+    and unchanged since) are skipped, so re-running never deletes real data.
     """
+    manifest = StageManifest(root_dir, "3-delete_last_row", use_hash=use_hash)
+    pending = []
+    skipped = 0
     for dirpath, dirnames, filenames in os.walk(root_dir):
         for file in filenames:
             if file.lower().endswith('.csv'):
                 full_path = os.path.join(dirpath, file)
-                remove_last_line(full_path)
+                if not force and manifest.is_done(full_path, [full_path]):
+                    skipped += 1
+                    continue
+                pending.append(full_path)
+
+    lock = threading.Lock()
+
+    def truncate_and_record(full_path):
+        # Record the truncated state as soon as this file is cut: it is what
+        # a re-run will see, and truncation and marker never get out of step.
+        ok = remove_last_line(full_path)
+        if ok:
+            with lock:
+                manifest.record(full_path, [full_path])
+        return ok
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(truncate_and_record, p) for p in pending]
+        for future in as_completed(futures):
+            future.result()
+    except BaseException:
+        # Interrupted: drop the queued files; the ones already running finish
+        # and record themselves before shutdown returns.
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+    manifest.compact()
+    if skipped:
+        print(f"Skipped {skipped} files already processed by an earlier run.")
 
 def main():
+    parser = argparse.ArgumentParser(description="Remove the last line of every CSV file under a folder.")
+    parser.add_argument("--force", action="store_true",
+                        help="Process every file again, ignoring the stage manifest")
+    parser.add_argument("--hash", action="store_true",
+                        help="Also compare a fast content hash when checking for unchanged files")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Files truncated in parallel (default: 8)")
+    args = parser.parse_args()
+
     root = input("Enter the root folder path (e.g. F:\\ServerData\\jan21): ").strip()
     if not root:
         print("No folder provided. Exiting.")
         return
-    process_directory(root)
+    process_directory(root, args.force, args.hash, args.workers)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,12 @@
 import os
 import shutil
 import re
+import argparse
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline_manifest import StageManifest
+from sensor_policy import SensorPolicy, add_policy_arguments, policy_from_args
 
 def get_existing_devices(base_path):
     """Get the list of existing device folders within the dataset path."""
@@ -31,48 +37,55 @@ def get_activities_for_subject(base_path, subject, existing_devices):
     activities = sorted(set.union(*activity_sets))
     return activities
 
-import re
-
-import re
-
+# Sensor name mappings
+SENSOR_MAPPINGS = {
+    # Smartphone Sensors
+    r"AK09916C Magnetic field Sensor": "magnetometer",
+    r"AK09916C Magnetic Sensor UnCalibrated": "magnetometer_uncalibrated",
+    r"Gravity Sensor": "gravity",
+    r"Interrupt Gyroscope Sensor": "interrupt_gyroscope",
+    r"Linear Acceleration Sensor": "linear_acceleration",
+    r"LSM6DSL Acceleration Sensor UnCalibrated": "accelerometer",
+    r"LSM6DSL Acceleration Sensor": "accelerometer_calibrated",
+    r"LSM6DSL Gyroscope sensor UnCalibrated": "gyroscope_uncalibrated",
+    r"LSM6DSL Gyroscope Sensor": "gyroscope",
+    # Smartwatch Sensors
+    r"AK09918C Magnetometer UnCalibrated": "magnetometer_uncalibrated",
+    r"AK09918C Magnetometer": "magnetometer",
+    r"LSM6DSO Accelerometer": "accelerometer",
+    r"LSM6DSO Gyroscope Uncalibrated": "gyroscope_uncalibrated",
+    r"LSM6DSO Gyroscope": "gyroscope",
+    r"Samsung Linear Acceleration Sensor": "linear_acceleration",
+    # Smartglass Sensors
+    r"ACCELEROMETER": "accelerometer",
+    r"GYROSCOPE": "gyroscope",
+    r"Magnetometer": "magnetometer"
+}
+
+# All mappings compiled once into a single case-insensitive matcher. Longer
+# names are listed before their prefixes, so the alternation picks the same
+# mapping the one-pattern-at-a-time replacement did.
+SENSOR_PATTERN = re.compile("|".join(SENSOR_MAPPINGS), re.IGNORECASE)
+SENSOR_LOOKUP = {key.lower(): value for key, value in SENSOR_MAPPINGS.items()}
+SUBJECT_PREFIX_PATTERN = re.compile(r'^[a-zA-Z0-9]+[_-]+', re.IGNORECASE)
+SAMSUNG_PATTERN = re.compile(r'\bSamsung\b', re.IGNORECASE)
+
+TRANSFER_MODES = ("copy", "hardlink", "move")
+COPY_WORKERS = 8
+
+@lru_cache(maxsize=None)
 def rename_file(file_name, device):
     """Rename CSV files based on device and sensor type without including the subject name."""
     device_name = device.replace("Smart_", "").lower()
 
     # Remove any leading subject ID (generic pattern: letters/numbers + _ or -)
-    file_name = re.sub(r'^[a-zA-Z0-9]+[_-]+', '', file_name, flags=re.IGNORECASE)
+    file_name = SUBJECT_PREFIX_PATTERN.sub('', file_name)
     
     # Remove "Samsung" from the filename
-    file_name = re.sub(r'\bSamsung\b', '', file_name, flags=re.IGNORECASE).strip()
-
-    # Sensor name mappings
-    sensor_mappings = {
-        # Smartphone Sensors
-        r"AK09916C Magnetic field Sensor": "magnetometer",
-        r"AK09916C Magnetic Sensor UnCalibrated": "magnetometer_uncalibrated",
-        r"Gravity Sensor": "gravity",
-        r"Interrupt Gyroscope Sensor": "interrupt_gyroscope",
-        r"Linear Acceleration Sensor": "linear_acceleration",
-        r"LSM6DSL Acceleration Sensor UnCalibrated": "accelerometer",
-        r"LSM6DSL Acceleration Sensor": "accelerometer_calibrated",
-        r"LSM6DSL Gyroscope sensor UnCalibrated": "gyroscope_uncalibrated",
-        r"LSM6DSL Gyroscope Sensor": "gyroscope",
-        # Smartwatch Sensors
-        r"AK09918C Magnetometer UnCalibrated": "magnetometer_uncalibrated",
-        r"AK09918C Magnetometer": "magnetometer",
-        r"LSM6DSO Accelerometer": "accelerometer",
-        r"LSM6DSO Gyroscope Uncalibrated": "gyroscope_uncalibrated",
-        r"LSM6DSO Gyroscope": "gyroscope",
-        r"Samsung Linear Acceleration Sensor": "linear_acceleration",
-        # Smartglass Sensors
-        r"ACCELEROMETER": "accelerometer",
-        r"GYROSCOPE": "gyroscope",
-        r"Magnetometer": "magnetometer"
-    }
+    file_name = SAMSUNG_PATTERN.sub('', file_name).strip()
 
     # Apply sensor name replacements (case-insensitive)
-    for key, value in sensor_mappings.items():
-        file_name = re.sub(key, value, file_name, flags=re.IGNORECASE)
+    file_name = SENSOR_PATTERN.sub(lambda match: SENSOR_LOOKUP[match.group(0).lower()], file_name)
 
     # Ensure consistent formatting
     new_name = f"{device_name}_{file_name}".replace(" ", "_")
@@ -84,26 +97,84 @@ def rename_file(file_name, device):
     return new_name
 
 
-def copy_files(base_path, subject, activities, save_path, existing_devices):
-    """Copy and rename CSV files while maintaining the correct structure."""
+def transfer_file(src, dst, mode="copy"):
+    """
+    Put src at dst by copying, hardlinking or moving it. Hardlinks and moves
+    fall back to a copy (and delete, for moves) when src and dst are on
+    different volumes.
+    """
+    if mode == "hardlink":
+        if os.path.lexists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # cross-device or unsupported file system
+    elif mode == "move":
+        shutil.move(src, dst)
+        return
+    shutil.copy(src, dst)
+
+
+def copy_files(base_path, subject, activities, save_path, existing_devices, manifest=None,
+               mode="copy", workers=COPY_WORKERS, policy=None):
+    """
+    Copy (or hardlink/move, see transfer_file) and rename CSV files while
+    maintaining the correct structure. The files of all activities are
+    transferred on a thread pool. Sensor files rejected by the policy
+    (sensor_policy.py) are not copied.
+    Activities whose source and copied files are unchanged since the last run
+    (according to the stage manifest) are skipped.
+    """
     subject_folder = os.path.join(save_path, subject)
     os.makedirs(subject_folder, exist_ok=True)
     
+    pending = []
     for activity in activities:
         activity_folder = os.path.join(subject_folder, activity)
         os.makedirs(activity_folder, exist_ok=True)
-        
+
+        copies = []
         for device, short_device in existing_devices.items():
             old_activity_path = os.path.join(base_path, device, subject, activity)
             if os.path.exists(old_activity_path):
                 for file in os.listdir(old_activity_path):
                     if file.endswith('.csv'):
                         new_file_name = rename_file(file, device)
-                        shutil.copy(os.path.join(old_activity_path, file), os.path.join(activity_folder, new_file_name))
-        print(f"CSV files copied successfully for activity '{activity}'!")
-
-def create_hierarchy(base_path, subjects, save_path, existing_devices):
+                        if policy is not None and not policy.accepts(new_file_name):
+                            continue
+                        copies.append((os.path.join(old_activity_path, file), os.path.join(activity_folder, new_file_name)))
+
+        sources = [src for src, _ in copies]
+        # The copies are split and deleted by 5-convert_to_atomic, so only the sources decide
+        if manifest is not None and manifest.is_done(activity_folder, sources, check_outputs=False):
+            print(f"Activity '{activity}' unchanged since the last run, skipping.")
+            continue
+        pending.append((activity, activity_folder, copies, sources))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        submitted = [(activity, activity_folder, copies, sources,
+                      [executor.submit(transfer_file, src, dst, mode) for src, dst in copies])
+                     for activity, activity_folder, copies, sources in pending]
+        for activity, activity_folder, copies, sources, futures in submitted:
+            try:
+                for future in futures:
+                    future.result()
+            except Exception as e:
+                print(f"Error copying files for activity '{activity}': {e}")
+                continue
+            if manifest is not None:
+                manifest.record(activity_folder, sources, [dst for _, dst in copies])
+            print(f"CSV files copied successfully for activity '{activity}'!")
+
+def create_hierarchy(base_path, subjects, save_path, existing_devices, mode="copy", workers=COPY_WORKERS,
+                     policy=None):
     """Create the directory structure and copy all selected activities for each subject."""
+    if policy is None:
+        policy = SensorPolicy()
+    policy.save(save_path)  # read back by 5-convert_to_atomic
+    manifest = StageManifest(save_path, "4-Structured_Data_Code")
     for subject in subjects:
         activities = get_activities_for_subject(base_path, subject, existing_devices)
         if not activities:
@@ -124,9 +195,19 @@ def create_hierarchy(base_path, subjects, save_path, existing_devices):
             else:
                 print("Invalid activity. Please choose from the list.")
         
-        copy_files(base_path, subject, selected_activities, save_path, existing_devices)
+        copy_files(base_path, subject, selected_activities, save_path, existing_devices, manifest, mode, workers, policy)
+    manifest.compact()
 
 def main():
+    parser = argparse.ArgumentParser(description="Build the subject/activity structure from the device folders.")
+    parser.add_argument("--mode", choices=TRANSFER_MODES, default="copy",
+                        help="copy files (default), hardlink them (same volume, no data is copied; "
+                             "in-place edits then show in both trees) or move them out of the device folders")
+    parser.add_argument("--workers", type=int, default=COPY_WORKERS,
+                        help="Files transferred in parallel (default: 8)")
+    add_policy_arguments(parser)
+    args = parser.parse_args()
+
     base_path = input("Enter the path to the dataset folder: ").strip()
     while not os.path.exists(base_path):
         print("Invalid path. Please try again.")
@@ -158,7 +239,8 @@ def main():
     save_path = input("Enter the path to save structured data: ").strip()
     os.makedirs(save_path, exist_ok=True)
     
-    create_hierarchy(base_path, selected_subjects, save_path, existing_devices)
+    create_hierarchy(base_path, selected_subjects, save_path, existing_devices, args.mode, args.workers,
+                     policy_from_args(args))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,16 @@
 import os
+import io
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import pandas as pd
 
+from atomic_events import iter_events
+from event_store import STORE_SUFFIX, write_recording
+from pipeline_manifest import StageManifest
+from sensor_policy import add_policy_arguments, policy_from_args
+
 # -------------------------------------------------------------------
 # Dictionary of activities to process (keys should be lowercase)
 # Only folders whose name (lowercase) is in this dictionary will be processed.
@@ -31,29 +41,32 @@ selected_activities = {
 # Any extra data that does not form a full 5-second block is discarded.
 # The event files are saved in the same folder as the original file.
 # After successful splitting, the original (large) file is deleted.
+# With output_format="store" the events are written once as a columnar
+# <base_name>.evt recording (see event_store.py) instead of _eN.csv files.
+# Returns the number of events written.
 # -------------------------------------------------------------------
-def split_file_into_events(file_path, event_duration_ms=5000):
+def split_file_into_events(file_path, event_duration_ms=5000, output_format="csv"):
     try:
         # Read the CSV file (no header, comma-delimited)
         df = pd.read_csv(file_path, header=None, delimiter=',')
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
-        return
+        return 0
 
     if df.empty:
         print(f"File {file_path} is empty. Skipping.")
-        return
+        return 0
 
     # Convert first column (timestamps) to numeric values
     try:
         df.iloc[:, 0] = pd.to_numeric(df.iloc[:, 0], errors='coerce')
     except Exception as e:
         print(f"Error converting timestamps in {file_path}: {e}")
-        return
+        return 0
 
     if df.iloc[:, 0].isnull().all():
         print(f"File {file_path} has invalid timestamps. Skipping.")
-        return
+        return 0
 
     start_ts = df.iloc[0, 0]
     end_ts = df.iloc[-1, 0]
@@ -61,24 +74,20 @@ def split_file_into_events(file_path, event_duration_ms=5000):
 
     if total_duration < 10000:
         # print(f"File {file_path} duration ({total_duration} ms) is less than 10 seconds. Skipping splitting.")
-        return
+        return 0
 
     # Calculate the number of full events (each event_duration_ms long)
     num_events = int(total_duration // event_duration_ms)
     folder, original_file = os.path.split(file_path)
     base_name, ext = os.path.splitext(original_file)
 
-    events_created = 0
-
-    for i in range(num_events):
-        event_start = start_ts + i * event_duration_ms
-        event_end = start_ts + (i + 1) * event_duration_ms
+    if output_format == "store":
+        return write_event_store(file_path, df, start_ts, num_events, event_duration_ms)
 
-        # Select rows with timestamp in [event_start, event_end)
-        event_df = df[(df.iloc[:, 0] >= event_start) & (df.iloc[:, 0] < event_end)]
-        if event_df.empty:
-            continue
+    events_created = 0
 
+    # All event windows [start + i*d, start + (i+1)*d) are located in one pass
+    for i, event_df in iter_events(df, start_ts, num_events, event_duration_ms):
         new_file_name = f"{base_name}_e{i}{ext}"
         new_file_path = os.path.join(folder, new_file_name)
         try:
@@ -95,47 +104,179 @@ def split_file_into_events(file_path, event_duration_ms=5000):
             print(f"Deleted original file: {file_path}")
         except Exception as e:
             print(f"Error deleting original file {file_path}: {e}")
+    return events_created
+
+# -------------------------------------------------------------------
+# Store output: write all events of one recording to <base_name>.evt and
+# delete the original file once the recording is saved.
+# -------------------------------------------------------------------
+def write_event_store(file_path, df, start_ts, num_events, event_duration_ms=5000):
+    if df.shape[1] < 4:
+        print(f"Error: {file_path} has fewer than 4 columns; cannot store x/y/z.")
+        return 0
+    xyz = df.iloc[:, 1:4].apply(pd.to_numeric, errors='coerce')
+    events = [(i, event_df.iloc[:, 0].to_numpy(), xyz.loc[event_df.index].to_numpy())
+              for i, event_df in iter_events(df, start_ts, num_events, event_duration_ms)]
+    if not events:
+        return 0
+
+    store_path = os.path.splitext(file_path)[0] + STORE_SUFFIX
+    try:
+        write_recording(store_path, events)
+    except Exception as e:
+        print(f"Error saving event store {store_path}: {e}")
+        return 0
+    try:
+        os.remove(file_path)
+        print(f"Deleted original file: {file_path}")
+    except Exception as e:
+        print(f"Error deleting original file {file_path}: {e}")
+    return len(events)
 
 # -------------------------------------------------------------------
-# Process all CSV files in an activity folder.
+# Process all CSV files in an activity folder. Sensor files rejected by the
+# policy (sensor_policy.py) are left untouched.
 # -------------------------------------------------------------------
-def process_activity_folder(activity_folder):
+def process_activity_folder(activity_folder, output_format="csv", manifest=None, policy=None):
     for file in os.listdir(activity_folder):
-        if file.lower().endswith('.csv'):
+        if file.lower().endswith('.csv') and (policy is None or policy.accepts(file)):
             file_path = os.path.join(activity_folder, file)
-            split_file_into_events(file_path)
+            if manifest is not None and manifest.is_done(file_path, [file_path]):
+                continue
+            split_file_into_events(file_path, output_format=output_format)
+            record_unsplit_file(manifest, file_path)
+
+# -------------------------------------------------------------------
+# Split files are deleted, so a re-run never sees them again. Files that
+# stay (too short, unreadable) are recorded in the stage manifest and
+# skipped until they change.
+# -------------------------------------------------------------------
+def record_unsplit_file(manifest, file_path):
+    if manifest is not None and os.path.exists(file_path):
+        manifest.record(file_path, [file_path])
 
 # -------------------------------------------------------------------
 # Process each subject folder (each subject contains several activity folders).
 # Only process activity folders that are in selected_activities.
 # -------------------------------------------------------------------
-def process_subject_folder(subject_folder):
+def process_subject_folder(subject_folder, output_format="csv", manifest=None, policy=None):
     for activity in os.listdir(subject_folder):
         if activity.lower() in selected_activities:
             activity_folder = os.path.join(subject_folder, activity)
             if os.path.isdir(activity_folder):
                 print(f"\nProcessing activity folder: {activity_folder}")
-                process_activity_folder(activity_folder)
+                process_activity_folder(activity_folder, output_format, manifest, policy)
 
 # -------------------------------------------------------------------
 # Process the entire dataset (multiple subjects).
 # -------------------------------------------------------------------
-def process_dataset(base_directory):
+def process_dataset(base_directory, output_format="csv", use_manifest=True, policy=None):
+    manifest = StageManifest(base_directory, "5-convert_to_atomic", enabled=use_manifest)
     for subject in os.listdir(base_directory):
         subject_folder = os.path.join(base_directory, subject)
         if os.path.isdir(subject_folder):
             print(f"\nProcessing subject folder: {subject_folder}")
-            process_subject_folder(subject_folder)
+            process_subject_folder(subject_folder, output_format, manifest, policy)
+    manifest.compact()
 
 # -------------------------------------------------------------------
-# Main function: prompt for base dataset folder and process it.
+# Parallel mode: every CSV file of the selected activities is an
+# independent job. Each file names its own _eN events, so the output is
+# identical to the serial run whatever order the workers finish in.
+# -------------------------------------------------------------------
+def collect_dataset_files(base_directory, policy=None):
+    """
+    List the CSV files the serial walk would visit, in a stable order.
+    """
+    file_paths = []
+    for subject in sorted(os.listdir(base_directory)):
+        subject_folder = os.path.join(base_directory, subject)
+        if not os.path.isdir(subject_folder):
+            continue
+        for activity in sorted(os.listdir(subject_folder)):
+            activity_folder = os.path.join(subject_folder, activity)
+            if activity.lower() not in selected_activities or not os.path.isdir(activity_folder):
+                continue
+            for file in sorted(os.listdir(activity_folder)):
+                if file.lower().endswith('.csv') and (policy is None or policy.accepts(file)):
+                    file_paths.append(os.path.join(activity_folder, file))
+    return file_paths
+
+def split_file_worker(file_path, output_format="csv"):
+    """
+    Run split_file_into_events in a worker process and hand its console
+    output back to the parent instead of interleaving it with other workers.
+    Returns (file_path, events_created, log_lines).
+    """
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        try:
+            events_created = split_file_into_events(file_path, output_format=output_format)
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            events_created = 0
+    return file_path, events_created, buffer.getvalue().splitlines()
+
+def process_dataset_parallel(base_directory, workers, output_format="csv", use_manifest=True, policy=None):
+    """
+    Split every selected file of the dataset across a pool of worker processes
+    and print one consolidated summary. Returns the per-file results.
+    """
+    manifest = StageManifest(base_directory, "5-convert_to_atomic", enabled=use_manifest)
+    file_paths = [path for path in collect_dataset_files(base_directory, policy)
+                  if not manifest.is_done(path, [path])]
+    print(f"Splitting {len(file_paths)} files with {workers} workers...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(partial(split_file_worker, output_format=output_format),
+                                   file_paths, chunksize=4):
+            record_unsplit_file(manifest, result[0])
+            results.append(result)
+    manifest.compact()
+
+    errors = [(path, line) for path, _, lines in results for line in lines if line.startswith("Error")]
+    split_files = [path for path, events, _ in results if events > 0]
+    total_events = sum(events for _, events, _ in results)
+
+    print("\nSummary:")
+    print(f"  Files scanned : {len(results)}")
+    print(f"  Files split   : {len(split_files)}")
+    print(f"  Files skipped : {len(results) - len(split_files)}")
+    print(f"  Events written: {total_events}")
+    print(f"  Errors        : {len(errors)}")
+    for _, line in errors:
+        print(f"    {line}")
+    return results
+
+# -------------------------------------------------------------------
+# Main function: take the base dataset folder from the command line
+# (or prompt for it) and process it.
 # -------------------------------------------------------------------
 def main():
-    base_directory = input("Enter the base dataset folder path (e.g. F:\\ServerData\\SynchronizedData): ").strip()
+    parser = argparse.ArgumentParser(description="Split synchronized recordings into 5-second event files.")
+    parser.add_argument("base_directory", nargs="?", help="Base dataset folder (prompted for if omitted)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes (default: 1, serial)")
+    parser.add_argument("--output-format", choices=["csv", "store"], default="csv",
+                        help="Write _eN.csv files (default) or one columnar .evt recording per file")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-check every file, ignoring the stage manifest")
+    add_policy_arguments(parser)
+    args = parser.parse_args()
+
+    base_directory = args.base_directory
+    if not base_directory:
+        base_directory = input("Enter the base dataset folder path (e.g. F:\\ServerData\\SynchronizedData): ").strip()
     if not os.path.exists(base_directory):
         print("Directory does not exist.")
         return
-    process_dataset(base_directory)
+    # Without policy options, the policy 4-Structured_Data_Code saved (or the default) applies
+    policy = policy_from_args(args, base_directory)
+    if args.workers > 1:
+        process_dataset_parallel(base_directory, args.workers, args.output_format, not args.force, policy)
+    else:
+        process_dataset(base_directory, args.output_format, not args.force, policy)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,9 @@
 import os
 
-KEYWORDS = ['interrupt', 'calibrated', 'uncalibrated', 'gravity', 'linear_acceleration']
+from sensor_policy import DEFAULT_DENY
+
+# Stages 4 and 5 already skip these sensors (sensor_policy.py); this cleans up older trees.
+KEYWORDS = DEFAULT_DENY
 
 def delete_matching_files(base_path):
     for root, dirs, files in os.walk(base_path):
@@ -1,5 +1,7 @@
 import os
-import shutil
+import argparse
+
+from folder_transfer import move_tree, TRANSFER_WORKERS
 
 # List of exact fall activity folder names to match
 fall_activities = [
@@ -17,7 +19,12 @@ fall_activities = [
     "fall_right"
 ]
 
-def copy_and_remove_fall_folders(src_root, dest_root):
+def copy_and_remove_fall_folders(src_root, dest_root, workers=TRANSFER_WORKERS):
+    """
+    Move every fall activity folder from src_root to dest_root. A folder is
+    renamed in one step on the same volume; across volumes it is copied, the
+    copy is checked (file count and sizes) and only then is the source deleted.
+    """
     if not os.path.exists(src_root):
         print("❌ Source path does not exist.")
         return
@@ -41,11 +48,13 @@ def copy_and_remove_fall_folders(src_root, dest_root):
 
                 if os.path.isdir(activity_path) and activity_folder in fall_activities:
                     dest_activity_path = os.path.join(dest_user_path, activity_folder)
-                    print(f"📁 Copying {activity_path} to {dest_activity_path}")
+                    print(f"📁 Moving {activity_path} to {dest_activity_path}")
                     try:
-                        shutil.copytree(activity_path, dest_activity_path, dirs_exist_ok=True)
-                        shutil.rmtree(activity_path)  # ✅ Delete after copy
-                        print(f"🗑️ Deleted source folder: {activity_path}")
+                        how = move_tree(activity_path, dest_activity_path, workers)
+                        if how == "renamed":
+                            print(f"🚚 Renamed source folder: {activity_path}")
+                        else:
+                            print(f"🗑️ Copied, verified and deleted source folder: {activity_path}")
                     except Exception as e:
                         print(f"⚠️ Error copying/deleting {activity_path}: {e}")
 
@@ -53,6 +62,11 @@ def copy_and_remove_fall_folders(src_root, dest_root):
 
 # Main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the fall activity folders into a separate dataset.")
+    parser.add_argument("--workers", type=int, default=TRANSFER_WORKERS,
+                        help="Files copied in parallel when moving across volumes (default: 8)")
+    args = parser.parse_args()
+
     src = input("Enter the source path (e.g., D://Data/): ").strip()
     dst = input("Enter the destination path to copy fall activities: ").strip()
-    copy_and_remove_fall_folders(src, dst)
+    copy_and_remove_fall_folders(src, dst, args.workers)
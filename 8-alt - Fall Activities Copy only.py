@@ -1,5 +1,7 @@
 import os
-import shutil
+import argparse
+
+from folder_transfer import copy_tree, verify_copy, LINK_MODES, TRANSFER_WORKERS
 
 # List of exact fall activity folder names to match
 fall_activities = [
@@ -17,7 +19,12 @@ fall_activities = [
     "fall_right"
 ]
 
-def copy_fall_folders(src_root, dest_root):
+def copy_fall_folders(src_root, dest_root, mode="copy", workers=TRANSFER_WORKERS):
+    """
+    Copy every fall activity folder from src_root to dest_root. mode "hardlink"
+    or "symlink" builds a view of the files instead of duplicating them, so
+    DS_FALL and DS_ADL can coexist without doubling disk usage.
+    """
     if not os.path.exists(src_root):
         print("❌ Source path does not exist.")
         return
@@ -42,13 +49,23 @@ def copy_fall_folders(src_root, dest_root):
                 # Check if it's a folder and matches one of the fall activities
                 if os.path.isdir(activity_path) and activity_folder in fall_activities:
                     dest_activity_path = os.path.join(dest_user_path, activity_folder)
-                    print(f"📁 Copying {activity_path} to {dest_activity_path}")
-                    shutil.copytree(activity_path, dest_activity_path, dirs_exist_ok=True)
+                    print(f"📁 Copying {activity_path} to {dest_activity_path}" + ("" if mode == "copy" else f" ({mode})"))
+                    copy_tree(activity_path, dest_activity_path, mode, workers)
+                    problems = verify_copy(activity_path, dest_activity_path)
+                    if problems:
+                        print(f"⚠️ Incomplete copy of {activity_path}: " + "; ".join(problems[:5]))
 
     print("✅ Copy operation completed.")
 
 # Main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy the fall activity folders into a separate dataset.")
+    parser.add_argument("--mode", choices=LINK_MODES, default="copy",
+                        help="copy the files (default), or hardlink/symlink them to save disk space")
+    parser.add_argument("--workers", type=int, default=TRANSFER_WORKERS,
+                        help="Files copied in parallel (default: 8)")
+    args = parser.parse_args()
+
     src = input("Enter the source path (e.g., D://Data/): ").strip()
     dst = input("Enter the destination path to copy fall activities: ").strip()
-    copy_fall_folders(src, dst)
+    copy_fall_folders(src, dst, args.mode, args.workers)
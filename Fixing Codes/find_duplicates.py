@@ -0,0 +1,204 @@
+import os
+import re
+import sys
+import csv
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_catalog import walk_dataset
+
+# -------------------------------------------------------------------
+# Content duplicate finder, in place of the "(1)"/"(2)" name checks of
+# Dataset cleaning.ipynb.
+#
+# Files are duplicates when their bytes are identical, whatever their names
+# and wherever they are in the tree (also across subjects). Candidates are
+# narrowed down in three steps, so most files are never read:
+#   1. same size (from the directory walk, nothing is read),
+#   2. same hash of the first and last BLOCK_SIZE bytes,
+#   3. same hash of the whole file.
+# Hashing runs on a thread pool (hashlib releases the GIL while hashing).
+#
+# Every group keeps one file: a name without a "(n)" copy suffix first,
+# then the shortest path. The default is a dry run that only writes the
+# log; --apply deletes the other copies and gives a kept "(n)" file its
+# clean name when that name is free. The log is written to the current
+# folder, outside the scanned tree; a log left in the root by earlier runs
+# is not scanned.
+# -------------------------------------------------------------------
+BLOCK_SIZE = 64 * 1024
+HASH_CHUNK = 1024 * 1024
+WORKERS = 8
+LOG_NAME = "duplicate_files.csv"
+COPY_SUFFIX = re.compile(r"\s*\(\d+\)(?=\.\w+$)")
+
+
+def _digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def partial_hash(path, size, block_size=BLOCK_SIZE):
+    """Hash of the first and last block_size bytes (the whole file when it is smaller than two blocks)."""
+    digest = _digest()
+    with open(path, 'rb') as f:
+        if size <= 2 * block_size:
+            digest.update(f.read())
+            return digest.hexdigest(), size
+        digest.update(f.read(block_size))
+        f.seek(-block_size, os.SEEK_END)
+        digest.update(f.read(block_size))
+    return digest.hexdigest(), 2 * block_size
+
+
+def full_hash(path, size=None, chunk_size=HASH_CHUNK):
+    digest = _digest()
+    read = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            read += len(chunk)
+    return digest.hexdigest(), read
+
+
+def _regroup(groups, func, workers):
+    """
+    Split every group of paths by func(path, size) -> (key, bytes_read) on a
+    thread pool. Returns (groups that still have two or more files, bytes read).
+    """
+    jobs = [(size, path) for size, paths in groups for path in paths]
+
+    def run(job):
+        size, path = job
+        try:
+            return func(path, size)
+        except OSError as e:
+            print(f"❌ Error reading {path}: {e}")
+            return None, 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run, jobs))
+
+    split = {}
+    for (size, path), (key, _) in zip(jobs, results):
+        if key is not None:
+            split.setdefault((size, key), []).append(path)
+    kept = [(size, sorted(paths)) for (size, _), paths in sorted(split.items()) if len(paths) > 1]
+    return kept, sum(read for _, read in results)
+
+
+def find_duplicates(root, workers=WORKERS, block_size=BLOCK_SIZE, verbose=True):
+    """
+    Groups of identical files under root: a list of (size, [paths]), largest
+    files first. Empty files are left out (they are not copies of anything).
+    """
+    by_size = {}
+    total_bytes = 0
+    for dirpath, _, files in walk_dataset(root, workers):
+        for name, size, _ in files:
+            if name == LOG_NAME and dirpath == root:
+                continue
+            total_bytes += size
+            if size > 0:
+                by_size.setdefault(size, []).append(os.path.join(dirpath, name))
+    n_files = sum(len(paths) for paths in by_size.values())
+    groups = [(size, sorted(paths)) for size, paths in by_size.items() if len(paths) > 1]
+    if verbose:
+        print(f"{n_files} files, {sum(len(p) for _, p in groups)} share their size with another file")
+
+    groups, partial_read = _regroup(groups, lambda path, size: partial_hash(path, size, block_size), workers)
+    small = [(size, paths) for size, paths in groups if size <= 2 * block_size]  # already hashed in full
+    large = [(size, paths) for size, paths in groups if size > 2 * block_size]
+    large, full_read = _regroup(large, full_hash, workers)
+
+    duplicates = sorted(small + large, key=lambda group: (-group[0], group[1]))
+    if verbose:
+        read = partial_read + full_read
+        share = read / total_bytes if total_bytes else 0.0
+        print(f"Read {read / 1e6:.1f} MB of {total_bytes / 1e6:.1f} MB ({share:.1%})")
+    return duplicates
+
+
+def choose_keeper(paths):
+    """The copy to keep: a name without a "(n)" suffix if there is one, then the shortest path."""
+    return min(paths, key=lambda path: (bool(COPY_SUFFIX.search(os.path.basename(path))), len(path), path))
+
+
+def clean_name(path):
+    return os.path.join(os.path.dirname(path), COPY_SUFFIX.sub('', os.path.basename(path)))
+
+
+def resolve_duplicates(duplicates, apply=False):
+    """
+    Keep one file of every group and delete the rest (only print with
+    apply=False). Returns log rows (group, size, path, action).
+    """
+    log = []
+    for group, (size, paths) in enumerate(duplicates, 1):
+        keeper = choose_keeper(paths)
+        target = clean_name(keeper)
+        if target != keeper and not os.path.exists(target):
+            action = f"keep (rename to {os.path.basename(target)})"
+        else:
+            action, target = "keep", keeper
+        log.append([group, size, keeper, action])
+        for path in paths:
+            if path != keeper:
+                log.append([group, size, path, "delete"])
+
+        if apply:
+            for path in paths:
+                if path != keeper:
+                    os.remove(path)
+                    print(f"🗑️ Deleted: {path}")
+            if target != keeper:
+                os.rename(keeper, target)
+                print(f"✅ Renamed: {keeper} → {target}")
+        else:
+            print(f"\n🔎 Group {group} ({size} bytes): keep {keeper}")
+            for path in paths:
+                if path != keeper:
+                    print(f"    would delete {path}")
+    return log
+
+
+def write_log(log, log_path):
+    with open(log_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["group", "size", "path", "action"])
+        writer.writerows(log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find byte-identical csv files and keep one copy of each.")
+    parser.add_argument("base_path", nargs="?", help="Dataset folder (prompted for if omitted)")
+    parser.add_argument("--apply", action="store_true", help="Delete the duplicates (default: dry run)")
+    parser.add_argument("--log", help=f"Log file (default: ./{LOG_NAME})")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Threads for hashing (default: 8)")
+    args = parser.parse_args()
+
+    base_path = args.base_path or input("Enter the dataset folder path: ").strip()
+    if not os.path.isdir(base_path):
+        print("❌ The path does not exist.")
+        return
+
+    duplicates = find_duplicates(base_path, args.workers)
+    log = resolve_duplicates(duplicates, args.apply)
+    log_path = args.log or LOG_NAME
+    write_log(log, log_path)
+
+    extra = sum(len(paths) - 1 for _, paths in duplicates)
+    wasted = sum(size * (len(paths) - 1) for size, paths in duplicates)
+    print(f"\n{len(duplicates)} duplicate groups, {extra} extra copies ({wasted / 1e6:.1f} MB)")
+    if not args.apply:
+        print("✅ Dry-run completed. No files were actually deleted.")
+    print(f"📄 Log saved to: {log_path}")
+
+
+if __name__ == "__main__":
+    main()
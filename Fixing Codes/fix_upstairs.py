@@ -1,7 +1,11 @@
 import os
+import sys
 import pandas as pd
 import re
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atomic_events import iter_events
+
 # Only process these two activities
 selected_activities = {"upstairs", "downstairs"}
 
@@ -87,12 +91,7 @@ def split_file_into_events_single(file_path):
     prefix = re.sub(r'_e\d+$', '', base_name)
 
     events_created = 0
-    for i in range(num_events):
-        event_start = start_ts + i * EVENT_DURATION_MS
-        event_end = start_ts + (i + 1) * EVENT_DURATION_MS
-        event_df = df[(df.iloc[:, 0] >= event_start) & (df.iloc[:, 0] < event_end)]
-        if event_df.empty:
-            continue
+    for i, event_df in iter_events(df, start_ts, num_events, EVENT_DURATION_MS):
         new_file_name = f"{prefix}_e{i}{ext}"
         new_file_path = os.path.join(folder, new_file_name)
         # If file exists (from previous run), skip to prevent overwrite
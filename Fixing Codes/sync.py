@@ -1,7 +1,13 @@
 import os
+import sys
 import shutil
+import argparse
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from csv_metadata import first_last_timestamps
+from atomic_events import iter_events
+
 # ------------------------------------------------------------
 # Define the selected activities list
 # ------------------------------------------------------------
@@ -20,12 +26,18 @@ selected_activities = ["sitting",
                     #    "upstairs",
                        ]  # Modify as needed
 
+# Event segmentation settings, same as 5-convert_to_atomic.py
+EVENT_DURATION_MS = 5000
+MIN_DURATION_MS = 10000
+
 # ------------------------------------------------------------
 # Function: Compute synchronization bounds for a given folder
 # ------------------------------------------------------------
 def get_synchronization_bounds_for_folder(folder_path):
     """
     Compute the overlapping time window for CSV files in a folder.
+    Only the first and last line of each file are read; the full parse
+    happens once, in slice_and_save_files_for_folder.
     """
     late_start = None
     early_finish = None
@@ -35,15 +47,8 @@ def get_synchronization_bounds_for_folder(folder_path):
         if file.lower().endswith('.csv'):
             file_path = os.path.join(folder_path, file)
             try:
-                df = pd.read_csv(file_path, header=None, delimiter=',')
-                if df.empty:
-                    continue
-                df.iloc[:, 0] = pd.to_numeric(df.iloc[:, 0], errors='coerce')
-                if df.iloc[:, 0].isnull().all():
-                    continue
-                file_start = df.iloc[:, 0][0]
-                file_end = df.iloc[:, 0][len(df) - 1]
-                if pd.isnull(file_start) or pd.isnull(file_end):
+                file_start, file_end = first_last_timestamps(file_path)
+                if file_start is None or file_end is None:
                     continue
                 valid_file_found = True
                 if late_start is None:
@@ -93,6 +98,74 @@ def slice_and_save_files_for_folder(folder_path, bounds, base_directory, output_
             except Exception as e:
                 print(f"Error processing file {file_path}: {e}")
 
+# ------------------------------------------------------------
+# Function: Fused sync + segmentation
+# Each file is read once, trimmed to the synchronization bounds and split
+# straight into 5-second _eN.csv events in the output folder, which is
+# what running this script and then 5-convert_to_atomic.py produces.
+# Files too short to split (< 10 s) are saved whole, as 5-convert leaves them.
+# The trimmed full recordings are only written when synchronized_directory
+# is given.
+# ------------------------------------------------------------
+def sync_and_segment_files_for_folder(folder_path, bounds, base_directory, output_directory,
+                                      synchronized_directory=None):
+    """
+    Slice CSV files within the synchronization bounds and save them as 5-second events.
+    """
+    if bounds[0] is None or bounds[1] is None:
+        print(f"Skipping folder {folder_path} due to invalid bounds.")
+        return
+
+    late_start, early_finish = bounds
+    relative_folder = os.path.relpath(folder_path, base_directory)
+    new_folder = os.path.join(output_directory, relative_folder)
+    os.makedirs(new_folder, exist_ok=True)
+    sync_folder = None
+    if synchronized_directory:
+        sync_folder = os.path.join(synchronized_directory, relative_folder)
+        os.makedirs(sync_folder, exist_ok=True)
+
+    for file in os.listdir(folder_path):
+        if file.lower().endswith('.csv'):
+            file_path = os.path.join(folder_path, file)
+            try:
+                df = pd.read_csv(file_path, header=None, delimiter=',')
+                if df.empty:
+                    continue
+                df.iloc[:, 0] = pd.to_numeric(df.iloc[:, 0], errors='coerce')
+                sliced_df = df[(df.iloc[:, 0] >= late_start) & (df.iloc[:, 0] <= early_finish)]
+                if sync_folder:
+                    sliced_df.to_csv(os.path.join(sync_folder, file), index=False, header=False, sep=',')
+
+                events_created = segment_synchronized_frame(sliced_df, new_folder, file)
+                if events_created == 0:
+                    sliced_df.to_csv(os.path.join(new_folder, file), index=False, header=False, sep=',')
+                    print(f"Synchronized file saved unsplit: {os.path.join(new_folder, file)}")
+                else:
+                    print(f"Synchronized {file} into {events_created} events in {new_folder}")
+            except Exception as e:
+                print(f"Error processing file {file_path}: {e}")
+
+def segment_synchronized_frame(sliced_df, new_folder, file):
+    """
+    Write the 5-second events of a trimmed recording as <name>_eN.csv.
+    Returns the number of events written.
+    """
+    if sliced_df.empty:
+        return 0
+    start_ts = sliced_df.iloc[0, 0]
+    total_duration = sliced_df.iloc[-1, 0] - start_ts
+    if not total_duration >= MIN_DURATION_MS:
+        return 0
+
+    num_events = int(total_duration // EVENT_DURATION_MS)
+    base_name, ext = os.path.splitext(file)
+    events_created = 0
+    for i, event_df in iter_events(sliced_df, start_ts, num_events, EVENT_DURATION_MS):
+        event_df.to_csv(os.path.join(new_folder, f"{base_name}_e{i}{ext}"), index=False, header=False, sep=',')
+        events_created += 1
+    return events_created
+
 # ------------------------------------------------------------
 # Function: Copy unselected activity folders
 # ------------------------------------------------------------
@@ -111,10 +184,11 @@ def copy_folder_contents(src_folder, dest_folder):
 # ------------------------------------------------------------
 # Function: Process selected and unselected activities
 # ------------------------------------------------------------
-def process_activities(base_directory, output_directory):
+def process_activities(base_directory, output_directory, segment=False, synchronized_directory=None):
     """
     Process only the selected activities for synchronization, 
     and copy unselected activities without modification.
+    With segment=True the selected activities are also split into 5-second events.
     """
     for subject in os.listdir(base_directory):
         subject_path = os.path.join(base_directory, subject)
@@ -136,7 +210,11 @@ def process_activities(base_directory, output_directory):
                 bounds = get_synchronization_bounds_for_folder(activity_path)
                 if bounds[0] is not None and bounds[1] is not None:
                     print(f"    Synchronization bounds: {bounds}")
-                    slice_and_save_files_for_folder(activity_path, bounds, base_directory, output_directory)
+                    if segment:
+                        sync_and_segment_files_for_folder(activity_path, bounds, base_directory,
+                                                          output_directory, synchronized_directory)
+                    else:
+                        slice_and_save_files_for_folder(activity_path, bounds, base_directory, output_directory)
                 else:
                     print(f"    Skipping activity '{activity}' due to invalid or missing bounds.")
                     print(activity_path)
@@ -148,6 +226,13 @@ def process_activities(base_directory, output_directory):
 # Main function
 # ------------------------------------------------------------
 def main():
+    parser = argparse.ArgumentParser(description="Synchronize activity recordings to their overlapping time window.")
+    parser.add_argument("--segment", action="store_true",
+                        help="Also split synchronized files into 5-second events (replaces running 5-convert_to_atomic.py)")
+    parser.add_argument("--keep-synchronized", metavar="FOLDER",
+                        help="With --segment, also save the trimmed full recordings under FOLDER")
+    args = parser.parse_args()
+
     base_directory = input("Enter the base dataset folder path (e.g. F:\\ServerData\\StructuredDataSet): ").strip()
     if not os.path.exists(base_directory):
         print("Base directory does not exist. Exiting.")
@@ -157,7 +242,7 @@ def main():
         print("No output folder provided. Exiting.")
         return
     os.makedirs(output_directory, exist_ok=True)
-    process_activities(base_directory, output_directory)
+    process_activities(base_directory, output_directory, args.segment, args.keep_synchronized)
 
 if __name__ == "__main__":
     main()
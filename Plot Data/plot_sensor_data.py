@@ -1,93 +1,146 @@
-import csv
+import argparse
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 
-def load_sensor_data(filepath):
+# Whole recordings are plotted through min/max decimation: the visible range
+# is cut into one bucket per pixel column and only the lowest and highest
+# sample of every bucket is drawn, so peaks stay where they are while a 3
+# minute 500 Hz file is a few thousand points. Zooming or panning decimates
+# the new visible range again from the full-resolution data.
+MARKER_LIMIT = 500  # draw sample markers when at most this many samples are visible
+
+
+def load_sensor_data(filepath, limit=None):
     """
     Loads sensor data from a CSV file.
-    
+
     Expects each row to be either in one of the following formats:
       1. timestamp,x_value,y_value,z_value
       2. timestamp,"x_value, y_value, z_value"
-      
+
     Returns:
-      timestamps: list of float timestamps
-      x_vals: list of float x-axis sensor values
-      y_vals: list of float y-axis sensor values
-      z_vals: list of float z-axis sensor values
+      timestamps: float array of timestamps
+      x_vals: float array of x-axis sensor values
+      y_vals: float array of y-axis sensor values
+      z_vals: float array of z-axis sensor values
+    Rows that cannot be parsed are dropped; limit keeps only the first rows.
+    """
+    df = pd.read_csv(filepath, header=None, skip_blank_lines=True, on_bad_lines='skip')
+    if df.shape[1] >= 4:
+        values = df.iloc[:, :4]
+    elif df.shape[1] == 2:
+        # One quoted field holds "x_value, y_value, z_value"
+        split = df.iloc[:, 1].astype(str).str.split(',', expand=True)
+        if split.shape[1] < 3:
+            return (np.empty(0),) * 4
+        values = pd.concat([df.iloc[:, 0], split.iloc[:, :3]], axis=1)
+    else:
+        return (np.empty(0),) * 4
+
+    # Columns pandas could not parse as numbers hold bad rows; those become NaN and are dropped
+    values = values.apply(lambda column: column if column.dtype.kind in 'if'
+                          else pd.to_numeric(column.astype(str).str.strip(), errors='coerce'))
+    values = values.dropna().to_numpy(dtype=np.float64)
+    if limit is not None:
+        values = values[:limit]
+    return values[:, 0], values[:, 1], values[:, 2], values[:, 3]
+
+
+def minmax_indices(values, n_buckets):
+    """
+    Indices of the samples to draw for values: the first and last sample and
+    the minimum and maximum of each of n_buckets equal buckets, in order.
+    """
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.empty(n_buckets * size)
+    padded[:n] = values
+    padded[n:] = values[-1]  # repeating the last sample changes no minimum or maximum
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + np.argmin(buckets, axis=1)
+    highs = offsets + np.argmax(buckets, axis=1)
+    return np.unique(np.concatenate(([0, n - 1], np.minimum(lows, n - 1), np.minimum(highs, n - 1))))
+
+
+def decimate(timestamps, values, n_buckets, t_min=None, t_max=None):
     """
-    timestamps = []
-    x_vals = []
-    y_vals = []
-    z_vals = []
-    
-    with open(filepath, 'r') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            # Skip if the row is empty or too short
-            if not row or len(row) < 2:
-                continue
-            
-            try:
-                # First field should be the timestamp
-                ts = float(row[0].strip())
-                
-                # If the row has 4 fields, assume they are timestamp, x, y, z
-                if len(row) >= 4:
-                    x = float(row[1].strip())
-                    y = float(row[2].strip())
-                    z = float(row[3].strip())
-                else:
-                    # Otherwise, assume row[1] is a string like "x_value, y_value, z_value"
-                    sensor_vals = row[1].split(',')
-                    if len(sensor_vals) < 3:
-                        continue
-                    x = float(sensor_vals[0].strip())
-                    y = float(sensor_vals[1].strip())
-                    z = float(sensor_vals[2].strip())
-                    
-                timestamps.append(ts)
-                x_vals.append(x)
-                y_vals.append(y)
-                z_vals.append(z)
-            except Exception as e:
-                print(f"Error processing row {row}: {e}")
-                continue
-                
-    return timestamps[:500], x_vals[:500], y_vals[:500], z_vals[:500]
-
-def plot_sensor_data(timestamps, x_vals, y_vals, z_vals,filepath):
+    The (timestamps, values) to draw for the samples between t_min and t_max,
+    and whether that is every sample of the range.
+    """
+    start = 0 if t_min is None else max(np.searchsorted(timestamps, t_min) - 1, 0)
+    stop = len(timestamps) if t_max is None else min(np.searchsorted(timestamps, t_max, side='right') + 1,
+                                                     len(timestamps))
+    t, v = timestamps[start:stop], values[start:stop]
+    keep = minmax_indices(v, n_buckets)
+    return t[keep], v[keep], len(keep) == len(v)
+
+
+def plot_sensor_data(timestamps, x_vals, y_vals, z_vals, filepath, points=None):
     """
     Plots the sensor data with timestamp on the x-axis and sensor values on the y-axis.
     X, Y, and Z values are shown in different colors.
+    points: buckets per line (default: one per pixel column of the axes).
     """
-    plt.figure(figsize=(10, 6))
-    plt.plot(timestamps, x_vals, label='X', color='red', marker='o')
-    plt.plot(timestamps, y_vals, label='Y', color='green', marker='o')
-    plt.plot(timestamps, z_vals, label='Z', color='blue', marker='o')
-    
-    plt.xlabel("Timestamp")
-    plt.ylabel("Sensor Value")
-    plt.title(filepath)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
+    order = np.argsort(timestamps, kind='stable')  # searchsorted needs increasing time
+    timestamps = np.asarray(timestamps)[order]
+    channels = [np.asarray(vals)[order] for vals in (x_vals, y_vals, z_vals)]
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    lines = [ax.plot([], [], label=label, color=color)[0]
+             for label, color in (('X', 'red'), ('Y', 'green'), ('Z', 'blue'))]
+
+    def redraw(t_min=None, t_max=None):
+        n_buckets = points or max(int(ax.bbox.width), 100)
+        for line, values in zip(lines, channels):
+            t, v, complete = decimate(timestamps, values, n_buckets, t_min, t_max)
+            line.set_data(t, v)
+            line.set_marker('o' if complete and len(t) <= MARKER_LIMIT else '')
+        fig.canvas.draw_idle()
+
+    redraw()
+    ax.relim()
+    ax.autoscale_view()
+
+    def on_xlim_changed(axes):
+        redraw(*axes.get_xlim())
+
+    ax.callbacks.connect('xlim_changed', on_xlim_changed)
+
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("Sensor Value")
+    ax.set_title(filepath)
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
     plt.show()
 
 def main():
-    filepath = input("Enter the full path to the CSV file: ").strip()
+    parser = argparse.ArgumentParser(description="Plot the x, y and z values of one sensor CSV.")
+    parser.add_argument("filepath", nargs="?", help="CSV file (prompted for if omitted)")
+    parser.add_argument("--limit", type=int, default=None, help="Only plot the first N samples (default: all)")
+    parser.add_argument("--points", type=int, default=None,
+                        help="Min/max buckets per line (default: one per pixel of the plot width)")
+    args = parser.parse_args()
+
+    filepath = args.filepath or input("Enter the full path to the CSV file: ").strip()
     if not filepath:
         print("No file path provided.")
         return
 
     print("Loading sensor data from file...")
-    timestamps, x_vals, y_vals, z_vals = load_sensor_data(filepath)
-    
-    if not timestamps:
+    timestamps, x_vals, y_vals, z_vals = load_sensor_data(filepath, args.limit)
+
+    if not len(timestamps):
         print("No valid sensor data found in the file.")
         return
-    
-    print("Plotting sensor data...")
-    plot_sensor_data(timestamps, x_vals, y_vals, z_vals,filepath)
+
+    print(f"Plotting {len(timestamps)} samples...")
+    plot_sensor_data(timestamps, x_vals, y_vals, z_vals, filepath, args.points)
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,28 @@
 import os
 import re
+import sys
 import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # files only, no window; safe in worker processes
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_store import STORE_SUFFIX, list_event_files, open_recording, read_event, store_path_for
+from dataset_catalog import has_catalog, refresh_catalog, query_files, query_directories
+
+# Groups are rendered on a process pool; every worker draws on one figure
+# that it clears between groups. Next to each PNG a small <png>.inputs.json
+# sidecar lists the event files it was drawn from; a group whose PNG is newer
+# than all of its event files and whose sidecar lists exactly those files is
+# skipped (--force renders everything again).
+FIGSIZE = (10, 6)
+_figure = None  # the figure of this worker process
+
 def clean_filename(file_name):
     """
     Remove redundant patterns like '_eX.csv_eX.csv' from the filename.
@@ -31,18 +49,68 @@ def parse_file_info(file_path, base_path):
         sensor, event_num = None, None
     return subject, activity, sensor, event_num
 
-def plot_event_files(file_paths, dest_base, base_path):
+def plot_path(file_paths, dest_base, base_path):
+    """Destination PNG of a (subject, activity, sensor) group."""
+    _, _, sensor, _ = parse_file_info(file_paths[0], base_path)
+    rel_folder = os.path.relpath(os.path.dirname(file_paths[0]), base_path)
+    return os.path.join(dest_base, rel_folder, f"{sensor}_x_axis_plot.png")
+
+def input_mtime(file_path):
+    """Modification time of an event file, or of its .evt recording when it lives in the store."""
+    if os.path.isfile(file_path):
+        return os.path.getmtime(file_path)
+    store_path, _ = store_path_for(file_path)
+    if store_path is not None and os.path.isdir(store_path):
+        return max(os.path.getmtime(os.path.join(store_path, name)) for name in os.listdir(store_path))
+    return float('inf')  # unknown: always render
+
+def inputs_path(dest_file):
+    """Sidecar listing the event files a PNG was drawn from."""
+    return dest_file + ".inputs.json"
+
+def input_list(file_paths, base_path):
+    return sorted(os.path.relpath(path, base_path) for path in file_paths)
+
+def is_up_to_date(file_paths, dest_file, base_path):
+    """
+    True when dest_file exists, was drawn from exactly these event files
+    (same --events selection, none added or deleted since) and is newer
+    than every one of them.
+    """
+    if not os.path.isfile(dest_file):
+        return False
+    try:
+        with open(inputs_path(dest_file), 'r') as f:
+            if json.load(f) != input_list(file_paths, base_path):
+                return False
+    except (OSError, ValueError):
+        return False
+    return os.path.getmtime(dest_file) > max(input_mtime(path) for path in file_paths)
+
+def _get_figure():
+    global _figure
+    if _figure is None:
+        _figure = plt.figure(figsize=FIGSIZE)
+    _figure.clear()
+    return _figure
+
+def plot_event_files(file_paths, dest_base, base_path, force=False):
     """
     Reads multiple CSV files for the same activity and sensor, 
     plots the 'x' values from each event in a single graph, 
     and saves the graph in the destination folder.
+    Returns "saved", "skipped" (PNG already up to date) or "empty".
     """
+    dest_file = plot_path(file_paths, dest_base, base_path)
+    if not force and is_up_to_date(file_paths, dest_file, base_path):
+        return "skipped"
+
     x_columns = []
     labels = []
     
     for file_path in file_paths:
         try:
-            df = pd.read_csv(file_path, delimiter=",", header=None)
+            df = read_event(file_path)
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             continue
@@ -65,66 +133,111 @@ def plot_event_files(file_paths, dest_base, base_path):
 
     if not x_columns:
         print("No valid data found for plotting.")
-        return
+        return "empty"
 
-    # Plot all event data on the same graph
-    plt.figure(figsize=(10, 6))
+    # Plot all event data on the same graph (the worker's figure, cleared)
+    fig = _get_figure()
+    ax = fig.add_subplot()
     for i, x_data in enumerate(x_columns):
-        plt.plot(x_data.values, label=labels[i])
+        ax.plot(x_data.values, label=labels[i])
 
     subject, activity, sensor, _ = parse_file_info(file_paths[0], base_path)
-    plt.title(f"{subject} - {activity} - {sensor} (X-axis)")
-    plt.xlabel("Time (samples)")
-    plt.ylabel("X Value")
-    plt.legend()
-    plt.grid(True)
+    ax.set_title(f"{subject} - {activity} - {sensor} (X-axis)")
+    ax.set_xlabel("Time (samples)")
+    ax.set_ylabel("X Value")
+    ax.legend()
+    ax.grid(True)
 
     # Save the plot
-    rel_folder = os.path.relpath(os.path.dirname(file_paths[0]), base_path)
-    dest_folder = os.path.join(dest_base, rel_folder)
-    os.makedirs(dest_folder, exist_ok=True)
-
-    dest_file = os.path.join(dest_folder, f"{sensor}_x_axis_plot.png")
-    plt.savefig(dest_file)
-    plt.close()
+    os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+    fig.savefig(dest_file)
+    with open(inputs_path(dest_file), 'w') as f:
+        json.dump(input_list(file_paths, base_path), f)
     print(f"Saved graph: {dest_file}")
+    return "saved"
+
+def _plot_group(task):
+    file_paths, dest_base, base_path, force = task
+    try:
+        return plot_event_files(file_paths, dest_base, base_path, force)
+    except Exception as e:
+        print(f"Error plotting {file_paths[0]}: {e}")
+        return "error"
+
+def plot_groups(file_groups, dest_dir, source_dir, workers=None, force=False):
+    """Render every group on a process pool. Returns {outcome: count}."""
+    tasks = [(sorted(paths), dest_dir, source_dir, force) for _, paths in sorted(file_groups.items())]
+    outcomes = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for outcome in executor.map(_plot_group, tasks, chunksize=8):
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return outcomes
 
 def main():
+    parser = argparse.ArgumentParser(description="Plot the x axis of selected events per subject, activity and sensor.")
+    parser.add_argument("source_dir", nargs="?", help="Structured data folder (prompted for if omitted)")
+    parser.add_argument("dest_dir", nargs="?", help="Destination folder for the graphs (prompted for if omitted)")
+    parser.add_argument("--events", help="Event numbers to plot, comma-separated (prompted for if omitted)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Render every graph again, even if it is up to date")
+    args = parser.parse_args()
+
     # Prompt for the source structured data folder
-    source_dir = input("Enter the path to the structured data folder: ").strip()
+    source_dir = args.source_dir or input("Enter the path to the structured data folder: ").strip()
     while not os.path.exists(source_dir):
         print("Path does not exist.")
         source_dir = input("Enter the path to the structured data folder: ").strip()
 
     # Prompt for the destination folder for graphs
-    dest_dir = input("Enter the destination path for plotted graphs: ").strip()
+    dest_dir = args.dest_dir or input("Enter the destination path for plotted graphs: ").strip()
     os.makedirs(dest_dir, exist_ok=True)
 
     # Prompt for the event numbers to plot (e.g., 0,1,2)
-    event_num_input = input("Enter the event numbers to plot (comma-separated, e.g., 0,1,2): ").strip()
+    event_num_input = args.events or input("Enter the event numbers to plot (comma-separated, e.g., 0,1,2): ").strip()
     event_to_plot = [int(num) for num in event_num_input.split(',')]
 
     # Traverse the hierarchy to collect event files by sensor
     file_groups = {}  # Dictionary to store files grouped by (subject, activity, sensor)
 
-    for root, _, files in os.walk(source_dir):
-        for file in files:
-            if file.lower().endswith('.csv'):
-                file_path = os.path.join(root, file)
-                subject, activity, sensor, event_num = parse_file_info(file_path, source_dir)
-                if None in (subject, activity, sensor, event_num):
-                    continue
-
-                # Only include files with the specified event numbers
-                if event_num in event_to_plot:
-                    key = (subject, activity, sensor)
-                    if key not in file_groups:
-                        file_groups[key] = []
-                    file_groups[key].append(file_path)
-
-    # Process each group of files and plot
-    for key, file_paths in file_groups.items():
-        plot_event_files(sorted(file_paths), dest_dir, source_dir)
+    # With a dataset catalog the event files are looked up instead of walked;
+    # events held in .evt store recordings are listed from the catalogued
+    # store folders, so both branches collect the same files.
+    if has_catalog(source_dir):
+        conn = refresh_catalog(source_dir, verbose=False)
+        event_files = [os.path.join(source_dir, row["path"])
+                       for row in query_files(conn, event_num=event_to_plot)
+                       if STORE_SUFFIX + os.sep not in row["path"]]
+        for store_dir in query_directories(conn, suffix=STORE_SUFFIX):
+            store_path = os.path.join(source_dir, store_dir)
+            recording = open_recording(store_path)
+            event_files.extend(os.path.join(os.path.dirname(store_path), f"{recording.sensor}_e{n}.csv")
+                               for n in recording.event_numbers() if n in event_to_plot)
+        for file_path in event_files:
+            subject, activity, sensor, _ = parse_file_info(file_path, source_dir)
+            if None not in (subject, activity, sensor):
+                file_groups.setdefault((subject, activity, sensor), []).append(file_path)
+        conn.close()
+    else:
+        # list_event_files also lists the events held in .evt store recordings
+        for root, dirs, _ in os.walk(source_dir):
+            dirs[:] = [d for d in dirs if not d.endswith(STORE_SUFFIX)]
+            for file in list_event_files(root):
+                if file.lower().endswith('.csv'):
+                    file_path = os.path.join(root, file)
+                    subject, activity, sensor, event_num = parse_file_info(file_path, source_dir)
+                    if None in (subject, activity, sensor, event_num):
+                        continue
+
+                    # Only include files with the specified event numbers
+                    if event_num in event_to_plot:
+                        key = (subject, activity, sensor)
+                        if key not in file_groups:
+                            file_groups[key] = []
+                        file_groups[key].append(file_path)
+
+    # Process the groups in parallel; up-to-date graphs are skipped
+    outcomes = plot_groups(file_groups, dest_dir, source_dir, args.workers, args.force)
+    print(f"{len(file_groups)} groups: " + ", ".join(f"{n} {outcome}" for outcome, n in sorted(outcomes.items())))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
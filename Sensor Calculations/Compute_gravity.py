@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
+import os
+import sys
 import argparse
+import numpy as np
 import pandas as pd
 import math
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resample import clean_timeline, interpolate
+
+# Block length of the vectorized complementary filter (see complementary_filter).
+FILTER_BLOCK = 256
+
 def read_sensor_file(filepath, col_names):
     """
     Reads a CSV file using only the first four columns and renames them.
@@ -15,6 +25,30 @@ def read_sensor_file(filepath, col_names):
     df[col_names[0]] = pd.to_numeric(df[col_names[0]], errors='coerce')
     return df
 
+def merge_sensors(df_acc, df_gyro, df_mag):
+    """
+    Put gyroscope and magnetometer samples on the accelerometer timestamps by
+    linear interpolation (the sensors are sampled at different instants, so an
+    exact timestamp join keeps almost no rows). Only accelerometer rows inside
+    the time range covered by all three sensors are kept.
+    """
+    timelines = [clean_timeline(df['timestamp'], df.iloc[:, 1:4].to_numpy().T) for df in (df_acc, df_gyro, df_mag)]
+    if any(len(t) == 0 for t, _ in timelines):
+        return pd.DataFrame(columns=list(df_acc.columns) + list(df_gyro.columns[1:]) + list(df_mag.columns[1:]))
+    start = max(t[0] for t, _ in timelines)
+    end = min(t[-1] for t, _ in timelines)
+    t_acc, acc = timelines[0]
+    keep = (t_acc >= start) & (t_acc <= end)
+    t = t_acc[keep]
+
+    merged = pd.DataFrame({'timestamp': t})
+    for df, values in ((df_acc, acc[:, keep]),
+                       (df_gyro, interpolate(*timelines[1], t)),
+                       (df_mag, interpolate(*timelines[2], t))):
+        for name, column in zip(df.columns[1:4], values):
+            merged[name] = column
+    return merged
+
 def compute_gravity_fusion(df, alpha=0.98, G=13.25):
     """
     Computes gravity using sensor fusion (accelerometer, gyroscope, and magnetometer).
@@ -96,6 +130,96 @@ def compute_gravity_fusion(df, alpha=0.98, G=13.25):
         
     return gravity_values
 
+def complementary_filter(u, alpha, initial=0.0, block=FILTER_BLOCK):
+    """
+    Solve the first-order recurrence  y[k] = alpha * y[k-1] + u[k],  y[-1] = initial
+    with NumPy instead of a Python loop.
+
+    The signal is cut into blocks of `block` samples. Inside a block the
+    recurrence is a lower-triangular matrix of powers of alpha applied to all
+    blocks at once; only the carried state is propagated block by block.
+    The weights are alpha**(k-j) with k >= j (and alpha**(k+1) for the carried
+    state), never a negative power, so with alpha < 1 every factor is at most 1
+    and the filter is numerically stable.
+    """
+    u = np.asarray(u, dtype=np.float64)
+    n = len(u)
+    if n == 0:
+        return u.copy()
+    block = min(block, n)
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = u
+    blocks = padded.reshape(n_blocks, block)
+
+    k = np.arange(block)
+    lag = k[:, None] - k[None, :]
+    weights = np.where(lag >= 0, alpha ** np.maximum(lag, 0), 0.0)  # weights[k, j] = alpha**(k-j)
+    local = blocks @ weights.T          # response of each block to its own inputs
+    decay = alpha ** (k + 1)            # contribution of the state carried into a block
+
+    out = np.empty_like(blocks)
+    state = initial
+    for b in range(n_blocks):
+        out[b] = local[b] + decay * state
+        state = out[b, -1]
+    return out.reshape(-1)[:n]
+
+def compute_gravity_fusion_vectorized(df, alpha=0.98, G=13.25, state=None):
+    """
+    Vectorized version of compute_gravity_fusion (same inputs and formulas).
+
+    The roll/pitch update
+        roll[k] = alpha * (roll[k-1] + gx_rad[k] * dt[k]) + (1 - alpha) * roll_acc[k]
+    is a linear recurrence in roll, so it runs as an IIR filter over whole
+    arrays; the accelerometer angles and the gravity vector are elementwise.
+
+    state: (prev_roll, prev_pitch, prev_time) carried over from the previous
+           chunk, or None to start from zero angles like the loop version.
+
+    Returns (gravity, state) where gravity is an (n, 4) array of
+    [timestamp, gravity_x, gravity_y, gravity_z] and state can be passed to
+    the next chunk.
+    """
+    t = df['timestamp'].to_numpy(dtype=np.float64)
+    ax = df['ax'].to_numpy(dtype=np.float64)
+    ay = df['ay'].to_numpy(dtype=np.float64)
+    az = df['az'].to_numpy(dtype=np.float64)
+    gx_rad = np.radians(df['gx'].to_numpy(dtype=np.float64))
+    gy_rad = np.radians(df['gy'].to_numpy(dtype=np.float64))
+
+    prev_roll, prev_pitch, prev_time = state if state is not None else (0.0, 0.0, t[0] if len(t) else 0.0)
+    dt = np.diff(t, prepend=prev_time) / 1000.0
+
+    roll_acc = np.arctan2(ay, az)
+    pitch_acc = np.arctan2(-ax, np.sqrt(ay**2 + az**2))
+
+    roll = complementary_filter(alpha * gx_rad * dt + (1 - alpha) * roll_acc, alpha, prev_roll)
+    pitch = complementary_filter(alpha * gy_rad * dt + (1 - alpha) * pitch_acc, alpha, prev_pitch)
+
+    gravity = np.column_stack((
+        t,
+        -G * np.sin(pitch),
+        G * np.sin(roll) * np.cos(pitch),
+        G * np.cos(roll) * np.cos(pitch),
+    ))
+    new_state = (roll[-1], pitch[-1], t[-1]) if len(t) else state
+    return gravity, new_state
+
+def compute_gravity_fusion_chunked(chunks, alpha=0.98, G=13.25):
+    """
+    Run compute_gravity_fusion_vectorized over an iterable of DataFrames
+    (e.g. consecutive slices of a long recording), carrying the filter state
+    across chunks so the result equals one pass over the whole recording.
+    Yields one (n, 4) gravity array per chunk.
+    """
+    state = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        gravity, state = compute_gravity_fusion_vectorized(chunk, alpha=alpha, G=G, state=state)
+        yield gravity
+
 def main():
     parser = argparse.ArgumentParser(
         description="Compute gravity vector from sensor fusion of accelerometer, gyroscope, and magnetometer data.\n"
@@ -108,6 +232,11 @@ def main():
     parser.add_argument("--alpha", type=float, default=0.98, help="Complementary filter coefficient (default: 0.98)")
     # Optionally, one could allow the gravitational constant to be adjusted
     parser.add_argument("--G", type=float, default=13.25, help="Gravitational constant to use (default: 13.25)")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="Filter and write this many rows at a time to bound memory (default: all at once)")
+    parser.add_argument("--loop", action="store_true", help="Use the original row-by-row implementation")
+    parser.add_argument("--exact-merge", action="store_true",
+                        help="Join the sensors on identical timestamps instead of interpolating onto the accelerometer")
     args = parser.parse_args()
     
     # Read sensor CSV files (using only the first four columns)
@@ -115,16 +244,30 @@ def main():
     df_gyro = read_sensor_file(args.gyro_file, ['timestamp', 'gx', 'gy', 'gz'])
     df_mag = read_sensor_file(args.mag_file, ['timestamp', 'mx', 'my', 'mz'])
     
-    # Merge data on timestamp (assuming time-synchronization)
-    df_merge = pd.merge(df_acc, df_gyro, on='timestamp')
-    df_merge = pd.merge(df_merge, df_mag, on='timestamp')
+    if args.exact_merge:
+        # Original behaviour: only rows with the same timestamp in all three files
+        df_merge = pd.merge(df_acc, df_gyro, on='timestamp')
+        df_merge = pd.merge(df_merge, df_mag, on='timestamp')
+    else:
+        df_merge = merge_sensors(df_acc, df_gyro, df_mag)
+    if df_merge.empty:
+        print("No rows left after merging the three recordings (no common time range or timestamps).")
+        return
     
     # Compute gravity vector using the complementary filter fusion
-    gravity_values = compute_gravity_fusion(df_merge, alpha=args.alpha, G=args.G)
-    
-    # Save the computed gravity values to CSV
-    df_out = pd.DataFrame(gravity_values, columns=['timestamp', 'gravity_x', 'gravity_y', 'gravity_z'])
-    df_out.to_csv(args.output, index=False)
+    columns = ['timestamp', 'gravity_x', 'gravity_y', 'gravity_z']
+    if args.loop:
+        gravity_values = compute_gravity_fusion(df_merge, alpha=args.alpha, G=args.G)
+        pd.DataFrame(gravity_values, columns=columns).to_csv(args.output, index=False)
+    elif args.chunksize:
+        # Filter and write chunk by chunk; the filter state is carried across chunks
+        chunks = (df_merge.iloc[i:i + args.chunksize] for i in range(0, len(df_merge), args.chunksize))
+        for i, gravity in enumerate(compute_gravity_fusion_chunked(chunks, alpha=args.alpha, G=args.G)):
+            pd.DataFrame(gravity, columns=columns).to_csv(args.output, index=False,
+                                                          mode='w' if i == 0 else 'a', header=(i == 0))
+    else:
+        gravity, _ = compute_gravity_fusion_vectorized(df_merge, alpha=args.alpha, G=args.G)
+        pd.DataFrame(gravity, columns=columns).to_csv(args.output, index=False)
     print(f"Computed gravity vector saved to {args.output}")
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import argparse
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# Load Compute_gravity.py from this folder (its file name is not a package import)
+spec = importlib.util.spec_from_file_location(
+    "compute_gravity", os.path.join(os.path.dirname(os.path.abspath(__file__)), "Compute_gravity.py"))
+compute_gravity = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(compute_gravity)
+
+def make_recording(seconds, rate_hz, seed=0):
+    """Synthetic merged accelerometer/gyroscope/magnetometer recording."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * rate_hz)
+    t = 1_700_000_000_000 + np.cumsum(rng.integers(1, 4, size=n))
+    data = {'timestamp': t.astype(np.float64)}
+    for prefix, scale in (('a', 9.81), ('g', 30.0), ('m', 40.0)):
+        for axis in 'xyz':
+            data[prefix + axis] = rng.normal(scale=scale, size=n)
+    return pd.DataFrame(data)
+
+def timed(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the loop and vectorized gravity computations.")
+    parser.add_argument("--seconds", type=float, default=180, help="Recording length (default: 180 s)")
+    parser.add_argument("--rate", type=float, default=500, help="Sample rate in Hz (default: 500)")
+    parser.add_argument("--chunksize", type=int, default=10_000, help="Chunk size for the chunked run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions of the fast versions")
+    args = parser.parse_args()
+
+    df = make_recording(args.seconds, args.rate)
+    print(f"Recording: {len(df)} samples ({args.seconds:g} s at {args.rate:g} Hz)")
+
+    loop_time, loop_result = timed(lambda: np.array(compute_gravity.compute_gravity_fusion(df)), 1)
+    vec_time, (vec_result, _) = timed(lambda: compute_gravity.compute_gravity_fusion_vectorized(df), args.repeat)
+    chunks = lambda: (df.iloc[i:i + args.chunksize] for i in range(0, len(df), args.chunksize))
+    chunk_time, chunk_result = timed(
+        lambda: np.vstack(list(compute_gravity.compute_gravity_fusion_chunked(chunks()))), args.repeat)
+
+    print(f"{'Version':<12} {'Time (s)':>10} {'Speed-up':>10} {'Max abs diff':>14}")
+    print("-" * 49)
+    for name, seconds, result in (("loop", loop_time, loop_result),
+                                  ("vectorized", vec_time, vec_result),
+                                  ("chunked", chunk_time, chunk_result)):
+        diff = np.max(np.abs(result - loop_result))
+        print(f"{name:<12} {seconds:>10.4f} {loop_time / seconds:>9.1f}x {diff:>14.3e}")
+
+    if not np.allclose(vec_result, loop_result, rtol=1e-9, atol=1e-9):
+        print("Vectorized output differs from the loop version!")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
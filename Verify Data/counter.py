@@ -1,43 +1,94 @@
 import os
+import re
+import csv
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 
-def count_values_in_csv(file_path):
+# Rows parsed per chunk; memory use stays constant whatever the file size.
+CHUNK_ROWS = 100_000
+
+def count_values_in_csv(file_path, chunksize=CHUNK_ROWS):
+    """
+    Stream a headerless sensor CSV in fixed-size chunks and count its rows and
+    non-null values. Returns (rows, values); (0, 0) if the file cannot be read.
+    """
+    rows = 0
+    values = 0
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        # Count the non-null values in the file
-        print(f"{file_path},, {df.notnull().sum()}")
-        return df.notnull().sum().sum()
+        for chunk in pd.read_csv(file_path, header=None, chunksize=chunksize):
+            rows += len(chunk)
+            values += int(chunk.notnull().to_numpy().sum())
+    except pd.errors.EmptyDataError:
+        return 0, 0
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
-        return 0
+        return 0, 0
+    return rows, values
 
-def traverse_and_count(directory):
-    folder_counts = {}
+def sensor_name(file_name):
+    """Sensor of a file name: 'phone_accelerometer_e3.csv' -> 'phone_accelerometer'."""
+    return re.sub(r'(_e\d+)?\.csv$', '', file_name, flags=re.IGNORECASE)
 
-    # Walk through the directory
+def traverse_and_count(directory, workers=None):
+    """
+    Count every CSV file under directory on a pool of worker processes.
+    Returns (folder_counts, sensor_counts), each mapping a name to
+    {"files": ..., "rows": ..., "values": ...}.
+    """
+    file_paths = []
     for root, _, files in os.walk(directory):
-        folder_name = os.path.relpath(root, directory)  # Relative folder name
-        if folder_name == ".":
-            folder_name = "Testing"  # Rename the base folder for clarity
-        
-        total_count = 0
         for file in files:
             if file.endswith('.csv'):
-                file_path = os.path.join(root, file)
-                total_count += count_values_in_csv(file_path)
-        
-        folder_counts[folder_name] = total_count
-    
-    return folder_counts
+                file_paths.append(os.path.join(root, file))
+
+    folder_counts = {}
+    sensor_counts = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(count_values_in_csv, file_paths, chunksize=16)
+        for file_path, (rows, values) in zip(file_paths, results):
+            folder_name = os.path.relpath(os.path.dirname(file_path), directory)
+            if folder_name == ".":
+                folder_name = "Testing"  # Rename the base folder for clarity
+            for counts, key in ((folder_counts, folder_name), (sensor_counts, sensor_name(os.path.basename(file_path)))):
+                totals = counts.setdefault(key, {"files": 0, "rows": 0, "values": 0})
+                totals["files"] += 1
+                totals["rows"] += rows
+                totals["values"] += values
+
+    return folder_counts, sensor_counts
+
+def write_counts(folder_counts, sensor_counts, output_path):
+    """Write the totals as CSV (level,name,files,rows,values) or JSON, by file extension."""
+    if output_path.lower().endswith('.json'):
+        with open(output_path, 'w') as f:
+            json.dump({"folders": folder_counts, "sensors": sensor_counts}, f, indent=2)
+        return
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['level', 'name', 'files', 'rows', 'values'])
+        for level, counts in (('folder', folder_counts), ('sensor', sensor_counts)):
+            for name in sorted(counts):
+                totals = counts[name]
+                writer.writerow([level, name, totals['files'], totals['rows'], totals['values']])
 
 def main():
-    # Replace this with the path to your HAR_DATA folder
-    base_directory = r"C:\Users\Malik Haider\Documents\HUMCARE\MPHIL Students Collected Data\DS"
-    counts = traverse_and_count(base_directory)
-    
-    # for folder, count in counts.items():
-        # print(f"Folder: {folder}, Total Values: {count}")
+    parser = argparse.ArgumentParser(description="Count rows and values of every sensor CSV under a folder.")
+    parser.add_argument("base_directory", nargs="?", help="Dataset folder (prompted for if omitted)")
+    parser.add_argument("--output", default="value_counts.csv",
+                        help="Totals table to write, .csv or .json (default: value_counts.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    base_directory = args.base_directory or input("Enter the dataset folder path: ").strip()
+    if not os.path.isdir(base_directory):
+        print("Directory does not exist.")
+        return
+    folder_counts, sensor_counts = traverse_and_count(base_directory, args.workers)
+    write_counts(folder_counts, sensor_counts, args.output)
+    print(f"Counted {sum(c['files'] for c in folder_counts.values())} files in {len(folder_counts)} folders; "
+          f"totals written to {args.output}")
 
 if __name__ == "__main__":
     main()
@@ -1,39 +1,137 @@
 import os
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from anytree import Node, RenderTree
 from colorama import Fore, Style, init
 
 # Initialize colorama
 init(autoreset=True)
 
-def build_hierarchy(path):
-    """Build a hierarchical tree structure from a directory path."""
-    def add_nodes(current_path, parent_node):
-        for entry in sorted(os.listdir(current_path)):
-            entry_path = os.path.join(current_path, entry)
-            if os.path.isdir(entry_path):
-                node = Node(entry, parent=parent_node, file_count=0)
-                add_nodes(entry_path, node)
-            else:
-                parent_node.file_count += 1
+# -------------------------------------------------------------------
+# Per-directory counts are cached in <root>/.hierarchy_cache.json, keyed by
+# directory mtime: {rel_path: {"mtime_ns": ..., "files": n, "dirs": [names]}}.
+# A directory's mtime changes when entries are added, removed or renamed in
+# it, so on a re-run unchanged directories cost one stat() instead of a
+# listing, and only changed folders are rescanned.
+# -------------------------------------------------------------------
+CACHE_NAME = ".hierarchy_cache.json"
+SCAN_WORKERS = 8
+
+def load_cache(path):
+    cache_file = os.path.join(path, CACHE_NAME)
+    if not os.path.isfile(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(path, cache):
+    cache_file = os.path.join(path, CACHE_NAME)
+    try:
+        with open(cache_file + ".tmp", 'w') as f:
+            json.dump(cache, f)
+        os.replace(cache_file + ".tmp", cache_file)
+    except OSError as e:
+        print(f"Could not write cache {cache_file}: {e}")
+
+def scan_directory(dir_path, cached):
+    """
+    Return ({"mtime_ns", "files", "dirs"}, rescanned) for one directory, using
+    the cached entry when the directory mtime is unchanged. One scandir pass:
+    the entry type comes from the directory listing, no stat per file.
+    """
+    mtime_ns = os.stat(dir_path).st_mtime_ns
+    if cached is not None and cached.get("mtime_ns") == mtime_ns:
+        return cached, False
+    files = 0
+    dirs = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.name)
+            elif entry.name != CACHE_NAME:
+                files += 1
+    return {"mtime_ns": mtime_ns, "files": files, "dirs": sorted(dirs)}, True
+
+def scan_subtree(path, rel_top, cache):
+    """Scan one subtree; returns ({rel_path: entry}, number of directories rescanned)."""
+    found = {}
+    rescanned = 0
+    stack = [rel_top]
+    while stack:
+        rel = stack.pop()
+        try:
+            entry, changed = scan_directory(os.path.join(path, rel), cache.get(rel))
+        except OSError as e:
+            print(f"Error scanning {os.path.join(path, rel)}: {e}")
+            continue
+        found[rel] = entry
+        rescanned += changed
+        stack.extend(os.path.join(rel, name) for name in entry["dirs"])
+    return found, rescanned
+
+def scan_hierarchy(path, use_cache=True, workers=SCAN_WORKERS):
+    """
+    Walk the tree once (one worker per top-level folder) and return
+    ({rel_path: entry}, number of directories rescanned).
+    """
+    cache = load_cache(path) if use_cache else {}
+    root_entry, rescanned = scan_directory(path, cache.get("."))
+    found = {".": root_entry}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for subtree, count in executor.map(lambda name: scan_subtree(path, name, cache), root_entry["dirs"]):
+            found.update(subtree)
+            rescanned += count
+    if use_cache:
+        save_cache(path, found)
+    return found, rescanned
+
+def aggregate_counts(found):
+    """Total files below every directory, summed bottom-up in one pass (deepest first)."""
+    totals = {}
+    for rel in sorted(found, key=lambda r: 0 if r == "." else r.count(os.sep) + 1, reverse=True):
+        entry = found[rel]
+        total = entry["files"]
+        for name in entry["dirs"]:
+            total += totals.get(os.path.normpath(os.path.join(rel, name)), 0)
+        totals[rel] = total
+    return totals
+
+def build_hierarchy(path, use_cache=True, workers=SCAN_WORKERS, max_depth=None):
+    """
+    Build a hierarchical tree structure from a directory path. Every node
+    carries file_count, the number of files anywhere below it. Directories
+    deeper than max_depth are counted but not added as nodes.
+    """
+    found, rescanned = scan_hierarchy(path, use_cache, workers)
+    totals = aggregate_counts(found)
 
     root_name = os.path.basename(path.rstrip(os.sep)) or path
-    root = Node(root_name, file_count=0)
-    add_nodes(path, root)
+    root = Node(root_name, file_count=totals["."])
+    stack = [(".", root, 0)]
+    while stack:
+        rel, node, depth = stack.pop()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for name in found[rel]["dirs"]:
+            child_rel = os.path.normpath(os.path.join(rel, name))
+            if child_rel in found:
+                child = Node(name, parent=node, file_count=totals[child_rel])
+                stack.append((child_rel, child, depth + 1))
+    root.rescanned = rescanned
+    root.directories = len(found)
     return root
 
+def hierarchy_to_dict(node):
+    """Nested {"name", "files", "children"} representation for JSON output."""
+    return {"name": node.name, "files": node.file_count,
+            "children": [hierarchy_to_dict(child) for child in node.children]}
+
 def display_hierarchy_with_file_count(root):
     """Display the hierarchy tree and file counts at all levels with colors."""
-    def count_files(node):
-        if not node.children:
-            return node.file_count
-        total = 0
-        for child in node.children:
-            total += count_files(child)
-        node.file_count = total
-        return total
-
-    count_files(root)  # Populate file counts for all nodes
-
     for pre, _, node in RenderTree(root):
         file_info = f" [Files: {node.file_count}]" if node.file_count > 0 else ""
 
@@ -49,16 +147,31 @@ def display_hierarchy_with_file_count(root):
         print(f"{pre}{color}{node.name}{file_info}{Style.RESET_ALL}")
 
 def main():
-    print("Welcome to the Hierarchy Viewer!")
-    path = input("Enter the directory path: ").strip()
+    parser = argparse.ArgumentParser(description="Show a directory hierarchy with file counts.")
+    parser.add_argument("path", nargs="?", help="Directory to show (prompted for if omitted)")
+    parser.add_argument("--depth", type=int, default=None, help="Only show this many folder levels")
+    parser.add_argument("--json", action="store_true", help="Print the hierarchy as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan every folder and do not write the cache")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS, help="Threads, one per top-level folder (default: 8)")
+    args = parser.parse_args()
 
-    if not os.path.exists(path):
+    if args.path:
+        path = args.path
+    else:
+        print("Welcome to the Hierarchy Viewer!")
+        path = input("Enter the directory path: ").strip()
+
+    if not os.path.isdir(path):
         print("Invalid path. Please try again.")
         return
 
-    root = build_hierarchy(path)
+    root = build_hierarchy(path, not args.no_cache, args.workers, args.depth)
+    if args.json:
+        print(json.dumps(hierarchy_to_dict(root), indent=2))
+        return
     print("\nHierarchy:")
     display_hierarchy_with_file_count(root)
-    
+    print(f"\n{root.directories} folders, {root.rescanned} rescanned.")
+
 if __name__ == "__main__":
     main()
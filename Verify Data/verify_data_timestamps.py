@@ -1,35 +1,32 @@
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from csv_metadata import file_metadata, scan_files
 
 def process_file(filepath):
     """
     Process a CSV file:
-      - Reads non-empty lines.
+      - Reads the first and last non-empty lines by seeking, not the whole file.
       - Extracts the timestamp (assumed to be the first value on each line).
+      - Counts the lines with a buffered newline scan over the raw bytes.
       - Returns the first timestamp, the last timestamp, and the total number of lines.
     """
     try:
-        with open(filepath, 'r') as f:
-            # Read all nonempty lines (strip whitespace)
-            lines = [line.strip() for line in f if line.strip()]
+        first_ts, last_ts, count = file_metadata(filepath)
     except Exception as e:
         print(f"Error reading file {filepath}: {e}")
         return None, None, 0
 
-    if not lines:
+    if count == 0:
         return None, None, 0
 
-    try:
-        # Assume CSV format: timestamp, sensorData
-        first_ts_str = lines[0].split(',')[0].strip()
-        last_ts_str  = lines[-1].split(',')[0].strip()
-        first_ts = int(first_ts_str)
-        last_ts = int(last_ts_str)
-    except Exception as e:
-        print(f"Error processing timestamps in file {filepath}: {e}")
+    if first_ts is None or last_ts is None:
+        print(f"Error processing timestamps in file {filepath}: timestamp is not a number")
         first_ts = None
         last_ts = None
 
-    return first_ts, last_ts, len(lines)
+    return first_ts, last_ts, count
 
 def main():
     # Prompt for the root folder (where the data is stored)
@@ -70,9 +67,10 @@ def main():
             if not csv_files:
                 print("  No CSV files found in this folder.")
             else:
-                for file in sorted(csv_files):
-                    filepath = os.path.join(target_folder, file)
-                    first_ts, last_ts, count = process_file(filepath)
+                # Read the metadata of all files of the folder on a thread pool
+                filepaths = [os.path.join(target_folder, file) for file in sorted(csv_files)]
+                for filepath, (first_ts, last_ts, count), _ in scan_files(filepaths, func=process_file):
+                    file = os.path.basename(filepath)
                     if first_ts is None or last_ts is None:
                         print(f"{file:<55} {'N/A':>20} {'N/A':>20}")
                     else:
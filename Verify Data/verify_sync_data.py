@@ -1,5 +1,10 @@
 import os
-import pandas as pd
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_store import STORE_SUFFIX, open_recording
+from csv_metadata import file_metadata, scan_files
+from dataset_catalog import has_catalog, refresh_catalog, query_files, query_directories
 
 # ------------------------------------------------------------
 # Function to process each CSV file in the synchronized data folder.
@@ -8,28 +13,42 @@ import pandas as pd
 # ------------------------------------------------------------
 def process_file(filepath):
     """
-    Reads a CSV file with no header and comma as delimiter, and returns:
+    Reads the first and last lines of a CSV file (seeking, no full parse) and
+    counts its lines with a raw newline scan, and returns:
       - total_rows: the number of data rows in the file
       - total_time: the difference between the last and first timestamp (numeric)
     """
     try:
-        # Read the CSV using comma as the delimiter (adjust if needed)
-        df = pd.read_csv(filepath, header=None, delimiter=',')
-        if df.empty:
+        first_ts, last_ts, total_rows = file_metadata(filepath)
+        if total_rows == 0:
             return 0, 0
-
-        # Convert the first column (timestamps) to numeric values
-        first_ts = pd.to_numeric(df.iloc[0, 0], errors='coerce')
-        last_ts = pd.to_numeric(df.iloc[-1, 0], errors='coerce')
-        if pd.isna(first_ts) or pd.isna(last_ts):
+        if first_ts is None or last_ts is None:
             raise ValueError("Timestamps could not be converted to numbers.")
-        total_rows = len(df)
         total_time = last_ts - first_ts
         return total_rows, total_time
     except Exception as e:
         print(f"Error processing file {filepath}: {e}")
         return None, None
 
+# ------------------------------------------------------------
+# Same statistics for each event of an event store recording (.evt folder).
+# Events are reported under their legacy <sensor>_eN.csv path.
+# ------------------------------------------------------------
+def process_store_recording(store_path):
+    try:
+        recording = open_recording(store_path)
+    except Exception as e:
+        print(f"Error processing store {store_path}: {e}")
+        return []
+    folder = os.path.dirname(store_path)
+    stats = []
+    for event_num in recording.event_numbers():
+        timestamps, _ = recording.event_arrays(event_num)
+        total_time = int(timestamps[-1] - timestamps[0]) if len(timestamps) else 0
+        filepath = os.path.join(folder, f"{recording.sensor}_e{event_num}.csv")
+        stats.append((filepath, len(timestamps), total_time))
+    return stats
+
 # ------------------------------------------------------------
 # Main function: recursively traverse the folder and print statistics.
 # ------------------------------------------------------------
@@ -44,14 +63,31 @@ def main():
     print(header)
     print("-" * len(header))
 
+    # A dataset catalog (dataset_catalog.py) answers without opening the CSV
+    # files; the catalogued .evt folders are reported like in the walk below
+    if has_catalog(root):
+        conn = refresh_catalog(root, verbose=False)
+        for row in query_files(conn):
+            filepath = os.path.join(root, row["path"])
+            if row["first_ts"] is not None and row["last_ts"] is not None:
+                print(f"{filepath:<120} {row['row_count']:>15} {row['last_ts'] - row['first_ts']:>15}")
+        for store_dir in query_directories(conn, suffix=STORE_SUFFIX):
+            for filepath, total_rows, total_time in process_store_recording(os.path.join(root, store_dir)):
+                print(f"{filepath:<120} {total_rows:>15} {total_time:>15}")
+        conn.close()
+        return
+
     # Walk through the directory structure
-    for dirpath, _, filenames in os.walk(root):
-        for file in filenames:
-            if file.lower().endswith('.csv'):
-                filepath = os.path.join(dirpath, file)
-                total_rows, total_time = process_file(filepath)
-                if total_rows is not None:
-                    print(f"{filepath:<120} {total_rows:>15} {total_time:>15}")
+    for dirpath, dirnames, filenames in os.walk(root):
+        filepaths = [os.path.join(dirpath, file) for file in filenames if file.lower().endswith('.csv')]
+        for filepath, (total_rows, total_time), _ in scan_files(filepaths, func=process_file):
+            if total_rows is not None:
+                print(f"{filepath:<120} {total_rows:>15} {total_time:>15}")
+        # Event store recordings: report every event without parsing any text
+        for store_dir in sorted(d for d in dirnames if d.endswith(STORE_SUFFIX)):
+            for filepath, total_rows, total_time in process_store_recording(os.path.join(dirpath, store_dir)):
+                print(f"{filepath:<120} {total_rows:>15} {total_time:>15}")
+        dirnames[:] = [d for d in dirnames if not d.endswith(STORE_SUFFIX)]
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,9 @@
 import os
-import pandas as pd
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from csv_metadata import first_last_timestamps, scan_files
+from dataset_catalog import has_catalog, refresh_catalog, query_files
 
 # ------------------------------------------------------------
 # Function to process a CSV file and extract its start and end timestamps.
@@ -7,19 +11,16 @@ import pandas as pd
 # ------------------------------------------------------------
 def process_file_timestamps(filepath):
     """
-    Reads a CSV file (with no header and comma as delimiter) and returns:
+    Reads only the first and last lines of a CSV file (with no header and comma
+    as delimiter) and returns:
       - start_ts: the first timestamp in the file (converted to numeric)
       - end_ts: the last timestamp in the file (converted to numeric)
     """
     try:
-        # Read the file without header using comma as the delimiter
-        df = pd.read_csv(filepath, header=None, delimiter=',')
-        if df.empty:
+        if os.path.getsize(filepath) == 0:
             return None, None
-        # Convert the first column to numeric values
-        start_ts = pd.to_numeric(df.iloc[0, 0], errors='coerce')
-        end_ts = pd.to_numeric(df.iloc[-1, 0], errors='coerce')
-        if pd.isna(start_ts) or pd.isna(end_ts):
+        start_ts, end_ts = first_last_timestamps(filepath)
+        if start_ts is None or end_ts is None:
             raise ValueError("Timestamps could not be converted to numbers.")
         return start_ts, end_ts
     except Exception as e:
@@ -40,14 +41,21 @@ def main():
     print(header)
     print("-" * len(header))
 
+    # A dataset catalog (dataset_catalog.py) answers without opening the CSV files
+    if has_catalog(root):
+        conn = refresh_catalog(root, verbose=False)
+        for row in query_files(conn):
+            if row["first_ts"] is not None and row["last_ts"] is not None:
+                print(f"{os.path.join(root, row['path']):<120} {row['first_ts']:>20} {row['last_ts']:>20}")
+        conn.close()
+        return
+
     # Walk through the directory structure
     for dirpath, _, filenames in os.walk(root):
-        for file in filenames:
-            if file.lower().endswith('.csv'):
-                filepath = os.path.join(dirpath, file)
-                start_ts, end_ts = process_file_timestamps(filepath)
-                if start_ts is not None and end_ts is not None:
-                    print(f"{filepath:<120} {start_ts:>20} {end_ts:>20}")
+        filepaths = [os.path.join(dirpath, file) for file in filenames if file.lower().endswith('.csv')]
+        for filepath, (start_ts, end_ts), _ in scan_files(filepaths, func=process_file_timestamps):
+            if start_ts is not None and end_ts is not None:
+                print(f"{filepath:<120} {start_ts:>20} {end_ts:>20}")
 
 if __name__ == "__main__":
     main()
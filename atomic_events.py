@@ -0,0 +1,57 @@
+import numpy as np
+
+# -------------------------------------------------------------------
+# Shared event-splitting engine used by 5-convert_to_atomic.py and
+# Fixing Codes/fix_upstairs.py.
+#
+# An event i covers the half-open window
+#     [start_ts + i * event_duration_ms, start_ts + (i + 1) * event_duration_ms)
+# and holds every row whose timestamp falls inside it, in file order.
+# All event boundaries are found in one searchsorted pass instead of
+# building a boolean mask over the whole file for every event.
+# -------------------------------------------------------------------
+def compute_event_bounds(timestamps, start_ts, num_events, event_duration_ms=5000):
+    """
+    Locate every event window of a recording in a single pass.
+
+    Parameters:
+      timestamps: 1-D array of numeric timestamps (ms), NaN for unparsable rows.
+      start_ts: timestamp the first event starts at.
+      num_events: number of full events to cut.
+      event_duration_ms: length of one event in milliseconds.
+
+    Returns:
+      (order, bounds) where rows order[bounds[i]:bounds[i + 1]] belong to event i.
+      order is None when the timestamps are already sorted, in which case
+      bounds index the recording directly and every event is a contiguous slice.
+    """
+    ts = np.asarray(timestamps, dtype=np.float64)
+    edges = start_ts + np.arange(num_events + 1, dtype=np.int64) * event_duration_ms
+
+    if not np.isnan(ts).any() and np.all(ts[1:] >= ts[:-1]):
+        return None, np.searchsorted(ts, edges, side='left')
+
+    # Unsorted (or partly unparsable) timestamps: bucket on a stable sort.
+    # NaN timestamps sort to the end and never fall inside a window.
+    order = np.argsort(ts, kind='stable')
+    return order, np.searchsorted(ts[order], edges, side='left')
+
+
+def iter_events(df, start_ts, num_events, event_duration_ms=5000):
+    """
+    Yield (event_index, event_df) for every non-empty event of df.
+
+    The first column of df must already hold numeric timestamps. Sorted
+    recordings are sliced as contiguous views; otherwise each event keeps
+    the original row order, exactly like a per-event boolean mask would.
+    """
+    order, bounds = compute_event_bounds(df.iloc[:, 0].to_numpy(), start_ts,
+                                         num_events, event_duration_ms)
+    for i in range(num_events):
+        lo, hi = bounds[i], bounds[i + 1]
+        if hi <= lo:
+            continue
+        if order is None:
+            yield i, df.iloc[lo:hi]
+        else:
+            yield i, df.iloc[np.sort(order[lo:hi])]
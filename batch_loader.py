@@ -0,0 +1,149 @@
+import queue
+import threading
+import numpy as np
+
+from training_set import SENSOR_ORDER, load_training_set
+
+# -------------------------------------------------------------------
+# Streaming mini-batch loader for the multi-input CNN-LSTM notebooks.
+#
+# Reads the arrays written by training_set.py. A .npy folder is memory-mapped,
+# so only the current batches are ever in RAM, whatever the dataset size.
+# Every batch is (inputs, labels) with one input array per sensor, in the
+# order of the model's Input layers:
+#     layout "flat"     (batch, 3 * length, 1)  x, then y, then z samples,
+#                       the shape the notebooks built from the JSON lists
+#     layout "channels" (batch, length, 3)
+# Shuffling permutes indices only; batches are gathered by a background
+# thread while the model trains on the previous one.
+#
+#     data = load_training_set("DS_AF_arrays")
+#     train_idx, test_idx = subject_split(data["subjects"], test_size=0.2)
+#     train = BatchLoader(data, train_idx, sensors=FALL_6D_SENSORS)
+#     model.fit(train.repeat(), steps_per_epoch=len(train), epochs=200)
+# -------------------------------------------------------------------
+LAYOUTS = ("flat", "channels")
+FALL_6D_SENSORS = [
+    'phone_accelerometer',
+    'phone_gyroscope',
+    'phone_magnetometer',
+    'watch_accelerometer',
+    'watch_gyroscope',
+    'watch_magnetometer'
+]
+
+
+def subject_split(subjects, test_subjects=None, test_size=0.2, seed=42):
+    """
+    Split event indices so that no subject is in both sets. Either name the
+    test subjects or let a seeded shuffle pick whole subjects until about
+    test_size of the events are in the test set. Returns (train_idx, test_idx).
+    """
+    subjects = np.asarray(subjects)
+    names, counts = np.unique(subjects, return_counts=True)
+    if test_subjects is None:
+        order = np.random.default_rng(seed).permutation(len(names))
+        target = test_size * len(subjects)
+        chosen, total = [], 0
+        for i in order:
+            if total >= target:
+                break
+            chosen.append(names[i])
+            total += counts[i]
+        test_subjects = chosen
+    is_test = np.isin(subjects, list(test_subjects))
+    return np.flatnonzero(~is_test), np.flatnonzero(is_test)
+
+
+class BatchLoader:
+    """
+    Iterable of (inputs, labels) mini-batches over part of a training set.
+    One pass over the loader is one epoch; repeat() yields epochs forever,
+    for model.fit(..., steps_per_epoch=len(loader)).
+    """
+
+    def __init__(self, data, indices=None, sensors=None, batch_size=32, shuffle=True, seed=None,
+                 layout="flat", prefetch=2, drop_last=False):
+        if isinstance(data, str):
+            data = load_training_set(data)
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {LAYOUTS}")
+        self.data = data
+        self.sensors = list(sensors) if sensors else [s for s in SENSOR_ORDER if s in data]
+        self.labels = data["labels"]
+        self.indices = np.arange(len(self.labels)) if indices is None else np.asarray(indices)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.layout = layout
+        self.prefetch = prefetch
+        self.drop_last = drop_last
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.indices) // self.batch_size
+        return -(-len(self.indices) // self.batch_size)
+
+    def _batch(self, batch_indices):
+        # Sorted indices read the mapped files front to back; order within a batch does not matter
+        batch_indices = np.sort(batch_indices)
+        inputs = []
+        for sensor in self.sensors:
+            block = np.asarray(self.data[sensor][batch_indices], dtype=np.float32)
+            if self.layout == "flat":
+                block = block.reshape(len(batch_indices), -1, 1)
+            else:
+                block = block.transpose(0, 2, 1)
+            inputs.append(block)
+        return inputs, np.asarray(self.labels[batch_indices])
+
+    def _batches(self):
+        order = self.rng.permutation(self.indices) if self.shuffle else self.indices
+        for k in range(len(self)):
+            yield self._batch(order[k * self.batch_size:(k + 1) * self.batch_size])
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            yield from self._batches()
+            return
+
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False  # the consumer stopped early
+
+        def produce():
+            try:
+                for batch in self._batches():
+                    if not put(batch):
+                        return
+                put(done)
+            except Exception as e:
+                put(e)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            worker.join()
+
+    def repeat(self):
+        """Yield batches epoch after epoch (reshuffled every epoch) forever."""
+        while True:
+            yield from self
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+import three_minute_fill
+
+NOTEBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Notebooks", "scratch",
+                        "3 Minute Data filling more concise way (1).ipynb")
+NOTEBOOK_CELLS = range(6)  # imports/constants up to process_all, without the example run
+
+def load_notebook_version():
+    """Execute the notebook's filler cells and return their namespace."""
+    with open(NOTEBOOK, 'r', encoding='utf-8') as f:
+        cells = json.load(f)["cells"]
+    namespace = {"__name__": "notebook_filler"}
+    for i in NOTEBOOK_CELLS:
+        exec("".join(cells[i]["source"]), namespace)
+    return namespace
+
+def make_dataset(root, subjects, seed=0):
+    """Synthetic 3 minute activities: jittered timestamps, some steps backwards, short and long files."""
+    rng = np.random.default_rng(seed)
+    sensors = {"phone_accelerometer": 500, "phone_gyroscope": 500, "phone_magnetometer": 100,
+               "watch_accelerometer": 100, "glass_accelerometer": 5}
+    activities = ["walking", "sitting", "jogging"]
+    for s in range(subjects):
+        for a, activity in enumerate(activities):
+            folder = Path(root) / f"sub{s + 1}" / activity
+            folder.mkdir(parents=True)
+            for sensor, rate in sensors.items():
+                seconds = rng.choice([5, 40, 120, 200])
+                n = int(seconds * rate)
+                dt = 1000.0 / rate
+                t = 1_700_000_000_000 + np.cumsum(rng.normal(dt, dt * 0.05, size=n)).astype(np.int64)
+                back = rng.random(n) < 0.01
+                t[back] -= int(3 * dt)
+                t = pd.unique(t)  # no duplicate timestamps, so the sort order is unambiguous
+                values = rng.normal(size=(len(t), 3))
+                frame = pd.DataFrame({0: t, 1: values[:, 0], 2: values[:, 1], 3: values[:, 2]})
+                frame.to_csv(folder / f"{sensor}.csv", index=False, header=False)
+
+def canonical(path):
+    """File content as a sortable array, without the all-NaN row the notebook's finalize appended."""
+    df = pd.read_csv(path, header=None)
+    df = df[df.iloc[:, 1:4].notna().any(axis=1)]
+    values = df.to_numpy(dtype=np.float64)
+    return values[np.lexsort(values.T[::-1])], df.iloc[:, 0].to_numpy(dtype=np.float64)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the notebook and module 3 minute fillers.")
+    parser.add_argument("--subjects", type=int, default=2, help="Synthetic subjects (3 activities x 5 sensors each)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for the module version")
+    args = parser.parse_args()
+
+    notebook = load_notebook_version()
+    with tempfile.TemporaryDirectory() as tmp:
+        source, nb_dir, mod_dir = (os.path.join(tmp, name) for name in ("source", "notebook", "module"))
+        make_dataset(source, args.subjects)
+        shutil.copytree(source, nb_dir)
+        shutil.copytree(source, mod_dir)
+
+        start = time.perf_counter()
+        nb_report = notebook["process_all"](Path(nb_dir), dry=False)
+        nb_time = time.perf_counter() - start
+        start = time.perf_counter()
+        mod_report = three_minute_fill.process_all(mod_dir, dry=False, workers=args.workers)
+        mod_time = time.perf_counter() - start
+
+        print(f"{'Version':<10} {'Time (s)':>10} {'Speed-up':>10}")
+        print("-" * 32)
+        print(f"{'notebook':<10} {nb_time:>10.3f} {1.0:>9.1f}x")
+        print(f"{'module':<10} {mod_time:>10.3f} {nb_time / mod_time:>9.1f}x")
+
+        # Same rows, compared by file; final_rows differs by the NaN row the notebook appended
+        key = lambda r: r.assign(file_path=r["file_path"].map(lambda p: os.path.relpath(p, tmp).split(os.sep, 1)[1]))
+        nb_rows = key(nb_report).sort_values("file_path").reset_index(drop=True)
+        mod_rows = key(mod_report).sort_values("file_path").reset_index(drop=True)
+        columns = [c for c in nb_rows.columns if c != "final_rows"]
+        same_rows = nb_rows[columns].astype(str).equals(mod_rows[columns].astype(str))
+        extra = nb_rows["final_rows"] - mod_rows["final_rows"]
+        print(f"\nReport rows: {len(mod_rows)}, identical apart from final_rows: {same_rows}; "
+              f"notebook NaN rows appended: {int((extra == 1).sum())}")
+
+        mismatched = []
+        for rel_path in mod_rows["file_path"]:
+            nb_values, nb_t = canonical(os.path.join(nb_dir, rel_path))
+            mod_values, mod_t = canonical(os.path.join(mod_dir, rel_path))
+            if not (np.array_equal(nb_t, mod_t) and np.array_equal(nb_values, mod_values)):
+                mismatched.append(rel_path)
+        print(f"Files with different data: {len(mismatched)}")
+        for rel_path in mismatched:
+            print(f"  {rel_path}")
+
+    if not same_rows or mismatched or not extra.isin([0, 1]).all():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
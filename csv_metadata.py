@@ -0,0 +1,123 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------------------------------------------
+# Fast metadata for the headerless sensor CSV files
+# (timestamp,x,y,z,... one sample per line).
+#
+# The first timestamp comes from the first non-empty line and the last
+# timestamp from seeking backwards from EOF, so the cost per file does not
+# depend on its size. Blank lines are ignored, like pd.read_csv does.
+# Line counts come from counting newline bytes in large raw blocks, without
+# decoding or splitting the file into Python strings.
+# -------------------------------------------------------------------
+BLOCK_SIZE = 4096
+COUNT_BLOCK_SIZE = 1024 * 1024
+SCAN_WORKERS = 8
+
+
+def read_first_line(filepath):
+    """Return the first non-empty line of the file (decoded), or None."""
+    with open(filepath, 'rb') as f:
+        for line in f:
+            if line.strip():
+                return line.decode('utf-8', errors='replace').strip()
+    return None
+
+
+def read_last_line(filepath, block_size=BLOCK_SIZE):
+    """
+    Return the last non-empty line of the file (decoded), or None.
+    Only the tail of the file is read, one block at a time, until a full line is found.
+    """
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            stripped = tail.rstrip()
+            # A newline before the last line means the line is complete.
+            newline = max(stripped.rfind(b'\n'), stripped.rfind(b'\r'))
+            if newline != -1:
+                return stripped[newline + 1:].decode('utf-8', errors='replace').strip()
+        stripped = tail.strip()
+        return stripped.decode('utf-8', errors='replace') if stripped else None
+
+
+def parse_timestamp(line):
+    """Parse the timestamp (first comma-separated field) of a line; None if invalid."""
+    if not line:
+        return None
+    field = line.split(',', 1)[0].strip().strip('"')
+    try:
+        return int(field)
+    except ValueError:
+        pass
+    try:
+        value = float(field)
+    except ValueError:
+        return None
+    return None if value != value else value
+
+
+def first_last_timestamps(filepath):
+    """Return (first_ts, last_ts) of a sensor CSV without parsing the whole file."""
+    return parse_timestamp(read_first_line(filepath)), parse_timestamp(read_last_line(filepath))
+
+
+def count_lines(filepath, block_size=COUNT_BLOCK_SIZE):
+    """
+    Count the lines of a file by scanning its raw bytes for newlines.
+    A final line without a trailing newline is counted, trailing blank lines
+    are not (blank lines inside the data are, they do not occur in sensor files).
+    """
+    count = 0
+    with open(filepath, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            count += block.count(b'\n')
+
+        # Look at the end of the file: newlines after the last data byte are not lines.
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        trailing_newlines = 0
+        while position > 0:
+            step = min(BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            data = block.rstrip(b'\r\n\t ')
+            trailing_newlines += block[len(data):].count(b'\n')
+            if data:
+                return count - trailing_newlines + 1
+    return 0
+
+
+def file_metadata(filepath):
+    """Return (first_ts, last_ts, line_count) of a sensor CSV."""
+    first_ts, last_ts = first_last_timestamps(filepath)
+    return first_ts, last_ts, count_lines(filepath)
+
+
+def scan_files(filepaths, workers=SCAN_WORKERS, func=file_metadata):
+    """
+    Run func (file_metadata by default) over many files on a thread pool.
+    Returns a list of (filepath, result, error) in the order of filepaths;
+    error holds the exception when func failed, otherwise None.
+    """
+    def run(filepath):
+        try:
+            return filepath, func(filepath), None
+        except Exception as e:
+            return filepath, None, e
+
+    if workers <= 1:
+        return [run(filepath) for filepath in filepaths]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, filepaths))
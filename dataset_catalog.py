@@ -0,0 +1,226 @@
+import os
+import re
+import sqlite3
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from csv_metadata import scan_files
+
+# -------------------------------------------------------------------
+# Persistent SQLite catalog of a dataset tree.
+#
+# One os.scandir walk (parallel per top-level folder) records a row per CSV
+# file with its device, subject, activity, sensor, event number, size,
+# mtime, row count, first/last timestamp and measured sample rate. The
+# catalog lives in <root>/.dataset_catalog.sqlite. A refresh re-reads only
+# the files that are new or whose size or mtime changed (files edited in
+# place included) and drops the rows of files that disappeared; full=True
+# re-reads everything.
+#
+# Works for both layouts used in this repo:
+#   <device>/<subject>/<activity>/<file>.csv   (raw data, device folder)
+#   <subject>/<activity>/<device>_<sensor>[_eN].csv   (structured data)
+# -------------------------------------------------------------------
+CATALOG_NAME = ".dataset_catalog.sqlite"
+DEVICE_PREFIXES = ("phone", "watch", "glass")
+FILE_PATTERN = re.compile(r'^(.*?)(?:_e0*(\d+))?\.csv$', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    device TEXT,
+    subject TEXT,
+    activity TEXT,
+    sensor TEXT,
+    event_num INTEGER,
+    size INTEGER,
+    mtime_ns INTEGER,
+    row_count INTEGER,
+    first_ts NUMERIC,
+    last_ts NUMERIC,
+    sample_rate REAL
+);
+CREATE INDEX IF NOT EXISTS files_folder ON files (folder);
+CREATE INDEX IF NOT EXISTS files_group ON files (subject, activity, sensor);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY
+);
+"""
+
+
+def catalog_path(root):
+    return os.path.join(root, CATALOG_NAME)
+
+
+def has_catalog(root):
+    """True when a catalog was built for root (scripts then answer from it)."""
+    return os.path.isfile(catalog_path(root))
+
+
+def open_catalog(root):
+    """Open (creating if needed) the catalog database of a dataset root."""
+    conn = sqlite3.connect(catalog_path(root))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def describe_file(rel_path):
+    """Derive (device, subject, activity, sensor, event_num) from a relative CSV path."""
+    parts = rel_path.replace('\\', '/').split('/')
+    match = FILE_PATTERN.match(parts[-1])
+    sensor = match.group(1) if match else os.path.splitext(parts[-1])[0]
+    event_num = int(match.group(2)) if match and match.group(2) else None
+    folders = parts[:-1]
+    activity = folders[-1] if len(folders) >= 1 else None
+    subject = folders[-2] if len(folders) >= 2 else None
+    device = sensor.split('_', 1)[0].lower() if sensor.lower().startswith(DEVICE_PREFIXES) else None
+    if device is None and len(folders) >= 3:
+        device = folders[-3]
+    return device, subject, activity, sensor, event_num
+
+
+def _scan_tree(top):
+    """scandir walk of one subtree: list of (dirpath, mtime_ns, [(name, size, mtime_ns)])."""
+    found = []
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        files = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith('.csv'):
+                        stat = entry.stat()
+                        files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+            found.append((dirpath, os.stat(dirpath).st_mtime_ns, files))
+        except OSError as e:
+            print(f"Error scanning {dirpath}: {e}")
+    return found
+
+
+def walk_dataset(root, workers=8):
+    """Walk the tree with one scandir worker per top-level folder."""
+    tops = [entry.path for entry in os.scandir(root) if entry.is_dir(follow_symlinks=False)]
+    root_files = [(entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                  for entry in os.scandir(root) if entry.is_file() and entry.name.lower().endswith('.csv')]
+    found = [(root, os.stat(root).st_mtime_ns, root_files)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for subtree in executor.map(_scan_tree, tops):
+            found.extend(subtree)
+    return found
+
+
+def refresh_catalog(root, full=False, workers=8, verbose=True):
+    """
+    Bring the catalog of root up to date and return an open connection.
+    Only files that are new or whose size or mtime changed are re-read.
+    """
+    conn = open_catalog(root)
+    known_dirs = {row["path"] for row in conn.execute("SELECT path FROM directories")}
+    known_files = {row["path"]: (row["folder"], row["size"], row["mtime_ns"])
+                   for row in conn.execute("SELECT path, folder, size, mtime_ns FROM files")}
+    found = walk_dataset(root, workers)
+
+    # Compare the size and mtime collected by the walk with the stored rows
+    stale = []
+    seen_files = set()
+    for dirpath, _, files in found:
+        folder = os.path.relpath(dirpath, root)
+        for name, size, file_mtime in files:
+            rel_path = os.path.relpath(os.path.join(dirpath, name), root)
+            seen_files.add(rel_path)
+            if full or known_files.get(rel_path) != (folder, size, file_mtime):
+                stale.append((dirpath, folder, name, size, file_mtime))
+    seen_dirs = {os.path.relpath(dirpath, root) for dirpath, _, _ in found}
+
+    # Read the metadata of every stale file on a thread pool
+    paths = [os.path.join(dirpath, name) for dirpath, _, name, _, _ in stale]
+    metadata = {path: result for path, result, _ in scan_files(paths, workers=workers)}
+
+    with conn:
+        rows = []
+        for dirpath, folder, name, size, file_mtime in stale:
+            rel_path = os.path.relpath(os.path.join(dirpath, name), root)
+            first_ts, last_ts, row_count = metadata.get(os.path.join(dirpath, name)) or (None, None, None)
+            sample_rate = None
+            if row_count and first_ts is not None and last_ts is not None and last_ts > first_ts:
+                sample_rate = (row_count - 1) * 1000.0 / (last_ts - first_ts)
+            rows.append((rel_path, folder, *describe_file(rel_path), size, file_mtime,
+                         row_count, first_ts, last_ts, sample_rate))
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+        conn.executemany("DELETE FROM files WHERE path = ?",
+                         [(path,) for path in set(known_files) - seen_files])
+        # Catalogs built before the mtime_ns column was dropped still have it
+        conn.executemany("INSERT OR IGNORE INTO directories (path) VALUES (?)",
+                         [(folder,) for folder in seen_dirs - known_dirs])
+        conn.executemany("DELETE FROM directories WHERE path = ?",
+                         [(folder,) for folder in known_dirs - seen_dirs])
+    if verbose:
+        print(f"Catalog refreshed: {len(paths)} of {len(seen_files)} files re-read "
+              f"in {len(found)} directories.")
+    return conn
+
+
+def query_files(conn, **filters):
+    """
+    Return catalog rows matching the given column filters, e.g.
+    query_files(conn, subject='sub1', activity='walking'). A list value
+    matches any of its items. Rows are ordered by path.
+    """
+    clauses, params = [], []
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            clauses.append(f"{column} IN ({','.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return conn.execute(f"SELECT * FROM files{where} ORDER BY path", params).fetchall()
+
+
+def query_directories(conn, suffix=None):
+    """Return the relative paths of the catalogued directories, optionally only those ending in suffix."""
+    paths = [row["path"] for row in conn.execute("SELECT path FROM directories ORDER BY path")]
+    return [path for path in paths if suffix is None or path.endswith(suffix)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the SQLite catalog of a dataset tree and query it.")
+    parser.add_argument("root", help="Dataset root folder")
+    parser.add_argument("--full", action="store_true", help="Re-read every file, not only new or changed ones")
+    parser.add_argument("--workers", type=int, default=8, help="Threads for walking and reading (default: 8)")
+    parser.add_argument("--device")
+    parser.add_argument("--subject")
+    parser.add_argument("--activity")
+    parser.add_argument("--sensor")
+    parser.add_argument("--list", action="store_true", help="Print the matching files with their statistics")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print("Directory does not exist.")
+        return
+    conn = refresh_catalog(args.root, args.full, args.workers)
+    rows = query_files(conn, device=args.device, subject=args.subject,
+                       activity=args.activity, sensor=args.sensor)
+    if args.list:
+        header = f"{'File Path':<70} {'Rows':>8} {'Time (s)':>10} {'Rate (Hz)':>10}"
+        print(header)
+        print("-" * len(header))
+        for row in rows:
+            duration = "N/A" if row["first_ts"] is None or row["last_ts"] is None \
+                else f"{(row['last_ts'] - row['first_ts']) / 1000.0:.3f}"
+            rate = "N/A" if row["sample_rate"] is None else f"{row['sample_rate']:.1f}"
+            print(f"{row['path']:<70} {row['row_count']:>8} {duration:>10} {rate:>10}")
+    print(f"{len(rows)} files match.")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
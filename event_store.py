@@ -0,0 +1,214 @@
+import os
+import re
+import argparse
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Columnar binary event store.
+#
+# Instead of one <device>_<sensor>_eN.csv per 5-second event, the atomic
+# stage can write each sensor recording once as a folder
+#     <device>_<sensor>.evt/
+#         timestamps.npy   int64   (rows,)      timestamps in ms
+#         values.npy       float32 (3, rows)    x, y and z channels
+#         events.npy       int64   (events, 3)  event number, start row, stop row
+# Rows are stored event after event, so every event is the contiguous
+# row range [start, stop) of both arrays and can be read without parsing text.
+# The events are cut by atomic_events.iter_events, the same windows the
+# _eN.csv files get. Recordings are opened memory-mapped, so an event is a
+# zero-copy slice of the mapped arrays.
+#
+# Consumers keep using the legacy event file paths
+# (<activity>/<device>_<sensor>_eN.csv): read_event() loads the real CSV
+# when it exists and falls back to the matching .evt recording otherwise.
+# -------------------------------------------------------------------
+STORE_SUFFIX = ".evt"
+EVENT_FILE_PATTERN = re.compile(r'^(.*)_e0*(\d+)\.csv$', re.IGNORECASE)
+
+
+def write_recording(store_path, events):
+    """
+    Write one sensor recording to store_path.
+
+    Parameters:
+      events: list of (event_number, timestamps, values) where timestamps is the
+              1-D timestamp column (ms) of the event and values its (rows, 3)
+              x, y and z columns.
+    """
+    ts_parts, value_parts, table = [], [], []
+    start = 0
+    for event_num, timestamps, values in events:
+        event_ts = np.asarray(timestamps, dtype=np.int64)
+        ts_parts.append(event_ts)
+        value_parts.append(np.asarray(values, dtype=np.float32))
+        table.append((event_num, start, start + len(event_ts)))
+        start += len(event_ts)
+
+    # Drop cached recordings before overwriting: they would keep mapping the
+    # old arrays (and on Windows hold the files open)
+    open_recording.cache_clear()
+    os.makedirs(store_path, exist_ok=True)
+    if ts_parts:
+        all_ts = np.concatenate(ts_parts)
+        all_values = np.ascontiguousarray(np.concatenate(value_parts).T)
+    else:
+        all_ts = np.empty(0, dtype=np.int64)
+        all_values = np.empty((3, 0), dtype=np.float32)
+    np.save(os.path.join(store_path, "timestamps.npy"), all_ts)
+    np.save(os.path.join(store_path, "values.npy"), all_values)
+    np.save(os.path.join(store_path, "events.npy"), np.array(table, dtype=np.int64).reshape(-1, 3))
+
+
+class StoreRecording:
+    """
+    One sensor recording of the event store.
+
+    With mmap=True (the default) the arrays are memory-mapped, so opening a
+    recording reads nothing but the .npy headers and every event returned by
+    event_arrays() is a zero-copy view into the mapped file.
+    """
+
+    def __init__(self, store_path, mmap=True):
+        mmap_mode = 'r' if mmap else None
+        self.path = store_path
+        self.sensor = os.path.basename(store_path.rstrip(os.sep))[:-len(STORE_SUFFIX)]
+        self.timestamps = np.load(os.path.join(store_path, "timestamps.npy"), mmap_mode=mmap_mode)
+        self.values = np.load(os.path.join(store_path, "values.npy"), mmap_mode=mmap_mode)
+        # The offset table is tiny; keep it in memory as the start/stop index.
+        table = np.load(os.path.join(store_path, "events.npy"))
+        self.events = {int(n): (int(start), int(stop)) for n, start, stop in table}
+
+    def event_numbers(self):
+        return sorted(self.events)
+
+    def event_arrays(self, event_num):
+        """Return (timestamps, values) of one event; values has shape (3, rows)."""
+        start, stop = self.events[event_num]
+        return self.timestamps[start:stop], self.values[:, start:stop]
+
+    def event_frame(self, event_num):
+        """Return one event as a headerless-CSV style DataFrame (columns 0..3)."""
+        ts, values = self.event_arrays(event_num)
+        return pd.DataFrame({0: ts, 1: values[0], 2: values[1], 3: values[2]})
+
+    def gather(self, event_nums, n_samples, out=None):
+        """
+        Copy the first n_samples of each requested event into a (events, 3, n_samples)
+        float32 array, straight from the mapped file.
+
+        Returns (out, ok) where ok[k] is False for events that are missing or have
+        fewer than n_samples rows; their rows of out are left untouched.
+        """
+        if out is None:
+            out = np.empty((len(event_nums), 3, n_samples), dtype=np.float32)
+        ok = np.zeros(len(event_nums), dtype=bool)
+        for k, event_num in enumerate(event_nums):
+            bounds = self.events.get(int(event_num))
+            if bounds is None or bounds[1] - bounds[0] < n_samples:
+                continue
+            out[k] = self.values[:, bounds[0]:bounds[0] + n_samples]
+            ok[k] = True
+        return out, ok
+
+
+@lru_cache(maxsize=256)
+def open_recording(store_path):
+    """
+    Open (and cache) the memory-mapped store recording at store_path.
+    write_recording clears the cache, so a rewritten recording is reopened.
+    """
+    return StoreRecording(store_path)
+
+
+def store_path_for(event_file_path):
+    """
+    Map a legacy event path (.../<sensor>_eN.csv) to (store_path, event_number).
+    Returns (None, None) when the name is not an event file.
+    """
+    folder, filename = os.path.split(event_file_path)
+    match = EVENT_FILE_PATTERN.match(filename)
+    if not match:
+        return None, None
+    return os.path.join(folder, match.group(1) + STORE_SUFFIX), int(match.group(2))
+
+
+def read_event(event_file_path):
+    """
+    Load one event as a DataFrame with the layout of pd.read_csv(header=None).
+    Reads the CSV when it exists on disk, otherwise the event store.
+    """
+    if os.path.isfile(event_file_path):
+        return pd.read_csv(event_file_path, header=None, delimiter=',')
+    store_path, event_num = store_path_for(event_file_path)
+    if store_path is None or not os.path.isdir(store_path):
+        raise FileNotFoundError(event_file_path)
+    recording = open_recording(store_path)
+    if event_num not in recording.events:
+        raise FileNotFoundError(event_file_path)
+    return recording.event_frame(event_num)
+
+
+def list_event_files(folder):
+    """
+    List the event file names of an activity folder: the CSV files on disk plus
+    the legacy names of every event held in the folder's .evt recordings.
+    """
+    names = []
+    for entry in sorted(os.listdir(folder)):
+        entry_path = os.path.join(folder, entry)
+        if entry.lower().endswith('.csv'):
+            names.append(entry)
+        elif entry.endswith(STORE_SUFFIX) and os.path.isdir(entry_path):
+            recording = open_recording(entry_path)
+            names.extend(f"{recording.sensor}_e{n}.csv" for n in recording.event_numbers())
+    return names
+
+
+# -------------------------------------------------------------------
+# Exporter: write the legacy <device>_<sensor>_eN.csv layout on demand.
+# Values come back as float32, the precision they are stored with.
+# -------------------------------------------------------------------
+def export_recording(store_path, output_folder=None):
+    """Write every event of one recording as _eN.csv files. Returns the count."""
+    recording = open_recording(store_path)
+    output_folder = output_folder or os.path.dirname(store_path.rstrip(os.sep))
+    os.makedirs(output_folder, exist_ok=True)
+    for event_num in recording.event_numbers():
+        new_file_path = os.path.join(output_folder, f"{recording.sensor}_e{event_num}.csv")
+        recording.event_frame(event_num).to_csv(new_file_path, index=False, header=False, sep=',')
+    return len(recording.events)
+
+
+def export_tree(base_directory, output_directory=None):
+    """Export every .evt recording under base_directory, mirroring the folder layout."""
+    exported = 0
+    for dirpath, dirnames, _ in os.walk(base_directory):
+        for dirname in sorted(dirnames):
+            if not dirname.endswith(STORE_SUFFIX):
+                continue
+            store_path = os.path.join(dirpath, dirname)
+            target = dirpath
+            if output_directory:
+                target = os.path.join(output_directory, os.path.relpath(dirpath, base_directory))
+            exported += export_recording(store_path, target)
+            print(f"Exported {store_path}")
+        # never descend into the store folders themselves
+        dirnames[:] = [d for d in dirnames if not d.endswith(STORE_SUFFIX)]
+    print(f"\nExported {exported} event files.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an event store to the legacy _eN.csv layout.")
+    parser.add_argument("base_directory", help="Dataset folder holding .evt recordings")
+    parser.add_argument("--output", help="Write the CSV tree here instead of next to the recordings")
+    args = parser.parse_args()
+    if not os.path.exists(args.base_directory):
+        print("Directory does not exist.")
+        return
+    export_tree(args.base_directory, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import os
+import zlib
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from csv_metadata import count_lines, scan_files
+from dataset_catalog import walk_dataset
+
+# -------------------------------------------------------------------
+# 5 second event repair (from "5 second data filling (1).ipynb").
+#
+# Every <sensor>_eN.csv of the selected activities is rewritten with
+# exactly rate * MIN_FACTOR rows and evenly spaced timestamps over 5 s:
+#   - at least rate * MIN_FACTOR rows: cut to that length,
+#   - at least THRESHOLD of it: padded by repeating the file from its start,
+#   - shorter: replaced by a noisy copy of a backup event of the same
+#     sensor and activity (another subject's recording).
+# repair_log.csv in the base folder lists every padded/replaced file.
+#
+# The notebook globbed the whole backup dataset for every replaced file.
+# Here the backup folder is indexed once, {(sensor, activity): [(path, rows)]},
+# and only events with enough rows are candidates. The backup of a file is
+# picked with a generator seeded by (seed, relative path), so a run is
+# reproducible whatever the worker order. Activity folders are repaired on
+# a process pool; padding and noise are whole-array operations.
+# -------------------------------------------------------------------
+EXPECTED_ROWS = {
+    "glass_accelerometer": 5, "glass_gyroscope": 5, "glass_magnetometer": 5,
+    "phone_acceleromter_calibrated": 100, "phone_accelerometer": 500,
+    "phone_gravity": 200, "phone_linear_acceleration": 100,
+    "phone_gyroscope_uncalibrated": 500, "phone_gyroscope": 500,
+    "phone_magnetometer_uncalibrated": 100, "phone_magnetometer": 100,
+    "phone_interrupt_gyroscope": 100, "watch_accelerometer": 100,
+    "watch_gyroscope_uncalibrated": 200, "watch_linear_acceleration": 100,
+    "watch_gyroscope": 100, "watch_magnetometer_uncalibrated": 100,
+    "watch_magnetometer": 100, "watch_gravity": 100,
+}
+
+SELECTED_ACTIVITIES = {
+    "bending", "standing_up_from_sitting", "sitting_down_from_standing", "squatting", "open_door", "close_door",
+    "put_on_floor", "pick_from_floor", "laying_down_from_sitting", "standing_up_from_laying", "open_bag", "open_big_box",
+    "close_lid_by_rotation", "plugin", "throw_out", "eat_small_things", "drink_water", "fall_forward", "fall_right",
+    "fall_backward", "fall_left", "fall_forward_when_trying_to_sit_down", "fall_backward_while_trying_to_sit_down",
+    "fall_forward_while_trying_to_stand_up", "fall_backward_while_trying_to_stand_up"
+}
+
+MIN_FACTOR = 4        # rows needed = rate * 4 seconds
+THRESHOLD = 0.7       # pad when at least 70% of them are there
+SIGMA_FACTOR = 0.001  # noise std as a fraction of the column std, for backup replacements
+EVENT_MS = 5000
+SEED = 0
+LOG_NAME = "repair_log.csv"
+LOG_COLUMNS = ["filepath", "rows_before", "rows_after", "action", "noise_sigma", "backup_source"]
+COLUMNS = ["timestamp", "x", "y", "z"]
+
+
+def sensor_of(file_name):
+    """Sensor name of an event file, e.g. glass_accelerometer for glass_accelerometer_e3.csv."""
+    return file_name.split("_e")[0]
+
+
+def required_rows(sensor, rates=EXPECTED_ROWS):
+    rate = rates.get(sensor)
+    return None if rate is None else rate * MIN_FACTOR
+
+
+def build_backup_pool(backup_root, workers=8):
+    """
+    Index every event file under backup_root once:
+    {(sensor, activity): [(path, rows), ...]} sorted by path, activity lower-cased.
+    """
+    paths = []
+    for dirpath, _, files in walk_dataset(backup_root, workers):
+        for name, _, _ in files:
+            if "_e" in name:
+                paths.append(os.path.join(dirpath, name))
+
+    pool = {}
+    for path, rows, error in scan_files(sorted(paths), workers, func=count_lines):
+        if error is not None:
+            continue
+        activity = os.path.basename(os.path.dirname(path)).lower()
+        pool.setdefault((sensor_of(os.path.basename(path)), activity), []).append((path, rows))
+    return pool
+
+
+def backup_candidates(pool, activity, rates=EXPECTED_ROWS):
+    """{sensor: [paths]} of the backups of one activity that have enough rows."""
+    candidates = {}
+    for (sensor, pool_activity), entries in pool.items():
+        min_rows = required_rows(sensor, rates)
+        if pool_activity != activity.lower() or min_rows is None:
+            continue
+        long_enough = [path for path, rows in entries if rows >= min_rows]
+        if long_enough:
+            candidates[sensor] = long_enough
+    return candidates
+
+
+def file_rng(path, base, seed=SEED):
+    """Random generator of one file, the same on every run and in every worker."""
+    rel_path = os.path.relpath(path, base).replace(os.sep, "/")
+    return np.random.default_rng([seed, zlib.crc32(rel_path.encode())])
+
+
+def read_event(path):
+    df = pd.read_csv(path, header=None)
+    if df.shape[1] < 4:
+        raise ValueError(f"File {os.path.basename(path)} has less than 4 columns")
+    df = df.iloc[:, :4]
+    df.columns = COLUMNS
+    return df
+
+
+def add_noise(values, rng, sigma_factor=SIGMA_FACTOR):
+    """Gaussian noise on every column of an (n, 3) array, std = column std * sigma_factor."""
+    sigma = np.nan_to_num(np.std(values, axis=0, ddof=1) * sigma_factor) if len(values) > 1 else np.zeros(3)
+    return values + rng.standard_normal(values.shape) * sigma
+
+
+def fit_rows(values, n_rows):
+    """Cut to n_rows, or repeat the rows from the start until there are n_rows."""
+    return values[np.arange(n_rows) % len(values)]
+
+
+def repair_file(path, base, candidates, rates=EXPECTED_ROWS, seed=SEED, dry=False):
+    """Repair one event file. Returns its repair_log row, or None if it was already long enough."""
+    sensor = sensor_of(os.path.basename(path))
+    min_rows = required_rows(sensor, rates)
+    if min_rows is None:
+        return None
+
+    try:
+        df = read_event(path)
+        rows_before = len(df)
+        start = df["timestamp"].iloc[0] if rows_before else 0
+        values = df[["x", "y", "z"]].to_numpy(dtype=np.float64)
+
+        if rows_before >= min_rows:
+            action, sigma, backup_src = "valid_can_be_trimmed", "NA", "NA"
+        elif rows_before >= int(min_rows * THRESHOLD):
+            action, sigma, backup_src = f"padded_{min_rows - rows_before}", "NA", "NA"
+        else:
+            sources = candidates.get(sensor)
+            if not sources:
+                raise FileNotFoundError(f"No backup found for {sensor} in {os.path.basename(os.path.dirname(path))}")
+            rng = file_rng(path, base, seed)
+            backup_src = sources[rng.integers(len(sources))]
+            backup = read_event(backup_src)
+            if rows_before == 0:
+                start = backup["timestamp"].iloc[0]
+            values = add_noise(backup[["x", "y", "z"]].to_numpy(dtype=np.float64), rng)
+            action, sigma = "backup_replaced", SIGMA_FACTOR
+            rows_before = len(backup)
+
+        values = fit_rows(values, min_rows)
+        out = pd.DataFrame(values, columns=["x", "y", "z"])
+        out.insert(0, "timestamp", np.linspace(start, start + EVENT_MS, min_rows))
+        if not dry:
+            out.to_csv(path, index=False, header=False)
+    except Exception as e:
+        print(f"❌ Error on {path}: {e}")
+        return [path, "NA", "NA", f"error:{e}", "NA", "NA"]
+
+    if action == "valid_can_be_trimmed":
+        return None
+    print(f"✅ {action}: {path}")
+    return [path, rows_before, min_rows, action, sigma, backup_src]
+
+
+def repair_folder(task, base, rates=EXPECTED_ROWS, seed=SEED, dry=False):
+    """Repair every event file of one activity folder. task = (folder, {sensor: backup paths})."""
+    folder, candidates = task
+    log = []
+    for name in sorted(os.listdir(folder)):
+        if "_e" in name and name.lower().endswith(".csv"):
+            row = repair_file(os.path.join(folder, name), base, candidates, rates, seed, dry)
+            if row is not None:
+                log.append(row)
+    return log
+
+
+def activity_folders(base):
+    """(subject/activity folder, activity) of every selected activity, in sorted order."""
+    folders = []
+    for subject in sorted(os.listdir(base)):
+        subj_path = os.path.join(base, subject)
+        if not os.path.isdir(subj_path):
+            continue
+        for activity in sorted(os.listdir(subj_path)):
+            act_path = os.path.join(subj_path, activity)
+            if activity.lower() in SELECTED_ACTIVITIES and os.path.isdir(act_path):
+                folders.append((act_path, activity))
+    return folders
+
+
+def process_dataset(base, backup_root, rates=EXPECTED_ROWS, seed=SEED, workers=None, dry=False):
+    """Repair every selected activity folder of base and write base/repair_log.csv. Returns the log."""
+    pool = build_backup_pool(backup_root, workers or 8)
+    print(f"Backup pool: {sum(len(entries) for entries in pool.values())} events in {len(pool)} sensor/activity groups")
+    tasks = [(folder, backup_candidates(pool, activity, rates)) for folder, activity in activity_folders(base)]
+
+    log = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for folder_log in executor.map(partial(repair_folder, base=base, rates=rates, seed=seed, dry=dry), tasks):
+            log.extend(folder_log)
+    report = pd.DataFrame(log, columns=LOG_COLUMNS)
+    report.to_csv(os.path.join(base, LOG_NAME), index=False)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring every 5 second event to its expected number of rows.")
+    parser.add_argument("base_path", nargs="?", help="Dataset folder to repair (prompted for if omitted)")
+    parser.add_argument("--backup", help="Dataset folder to take replacement events from (prompted for if omitted)")
+    parser.add_argument("--seed", type=int, default=SEED, help="Seed for backup selection and noise (default: 0)")
+    parser.add_argument("--measured-rates", action="store_true",
+                        help="Use the rates measured by sample_rates.py in the base folder where available")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, also the threads indexing the backup pool (default: all cores; 8 threads)")
+    parser.add_argument("--dry-run", action="store_true", help="Only write the log, leave the files unchanged")
+    args = parser.parse_args()
+
+    base_path = args.base_path or input("Enter the dataset folder path: ").strip()
+    backup_path = args.backup or input("Enter the backup dataset folder path: ").strip()
+    if not os.path.isdir(base_path) or not os.path.isdir(backup_path):
+        print("❌ Path does not exist.")
+        return
+
+    rates = EXPECTED_ROWS
+    if args.measured_rates:
+        from sample_rates import sensor_rates
+        rates = sensor_rates(base_path, EXPECTED_ROWS)
+    report = process_dataset(base_path, backup_path, rates, args.seed, args.workers, args.dry_run)
+    print(report["action"].value_counts().to_string() if not report.empty else "Nothing to repair.")
+    print(f"\n📑 Repair log saved to {os.path.join(base_path, LOG_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import errno
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------------------------------------------
+# Moving, copying and linking whole activity folders (used by the
+# 8-Fall Segmentation scripts).
+#
+# A move is a single directory rename when source and destination are on
+# the same volume. Across volumes the files are copied on a thread pool,
+# the copy is checked (every source file present with the same size) and
+# only then is the source deleted. Copies can instead be hardlink or
+# symlink "views" that take no extra disk space.
+# -------------------------------------------------------------------
+TRANSFER_WORKERS = 8
+LINK_MODES = ("copy", "hardlink", "symlink")
+
+
+def tree_inventory(root):
+    """Return {relative path: size} of every file below root (links are followed)."""
+    inventory = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            inventory[os.path.relpath(path, root)] = os.stat(path).st_size
+    return inventory
+
+
+def verify_copy(src, dst):
+    """
+    Check that every file of src exists in dst with the same size.
+    Returns a list of problems; empty when the copy is complete.
+    """
+    expected = tree_inventory(src)
+    found = tree_inventory(dst) if os.path.isdir(dst) else {}
+    problems = []
+    for rel_path, size in expected.items():
+        if rel_path not in found:
+            problems.append(f"missing {rel_path}")
+        elif found[rel_path] != size:
+            problems.append(f"size mismatch {rel_path}: {found[rel_path]} != {size}")
+    return problems
+
+
+def _is_link_to(src, dst):
+    """True when dst is a symlink, or a hardlink of (the same file as) src."""
+    if os.path.islink(dst):
+        return True
+    try:
+        return os.path.samefile(src, dst)
+    except OSError:
+        return False
+
+
+def _place_file(src, dst, mode):
+    # A copy over a linked view must replace the link: copy2 would otherwise
+    # write through it into the source file (or fail with SameFileError).
+    if os.path.lexists(dst) and (mode != "copy" or _is_link_to(src, dst)):
+        os.remove(dst)
+    if mode == "hardlink":
+        os.link(src, dst)
+    elif mode == "symlink":
+        os.symlink(os.path.abspath(src), dst)
+    else:
+        shutil.copy2(src, dst)
+
+
+def copy_tree(src, dst, mode="copy", workers=TRANSFER_WORKERS):
+    """
+    Recreate the folder tree of src under dst (merging with existing folders)
+    and copy, hardlink or symlink its files on a thread pool.
+    """
+    jobs = []
+    for dirpath, _, filenames in os.walk(src):
+        target_dir = os.path.join(dst, os.path.relpath(dirpath, src))
+        os.makedirs(target_dir, exist_ok=True)
+        jobs.extend((os.path.join(dirpath, name), os.path.join(target_dir, name)) for name in filenames)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(_place_file, s, d, mode) for s, d in jobs]:
+            future.result()
+    return len(jobs)
+
+
+def move_tree(src, dst, workers=TRANSFER_WORKERS):
+    """
+    Move the folder src to dst. Uses one atomic rename when dst does not exist
+    (or is empty) and both are on the same volume; across volumes copies the
+    files in parallel, verifies the copy and deletes src. Returns "renamed" or
+    "copied"; raises RuntimeError (leaving src untouched) if the check fails.
+    Other rename errors (permissions, files in use) are raised as they are.
+    """
+    if os.path.isdir(dst) and not os.listdir(dst):
+        os.rmdir(dst)
+    if not os.path.exists(dst):
+        try:
+            os.rename(src, dst)
+            return "renamed"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise  # permission denied, file in use, ...: leave src alone
+            # different volume: copy, verify, then delete
+
+    copy_tree(src, dst, "copy", workers)
+    problems = verify_copy(src, dst)
+    if problems:
+        raise RuntimeError(f"copy of {src} incomplete, source kept: " + "; ".join(problems[:5]))
+    shutil.rmtree(src)
+    return "copied"
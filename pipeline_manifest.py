@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+
+# -------------------------------------------------------------------
+# Per-stage manifest for incremental, resumable pipeline runs.
+#
+# A stage processes "units" (a file or a folder). After a unit is done the
+# stage records the fingerprints of the files it consumed and produced:
+#     {unit_key: {"inputs": {path: fingerprint}, "outputs": {path: fingerprint}}}
+# A fingerprint is (size, mtime_ns) plus, optionally, a fast hash of the
+# head and tail of the file. On a re-run a unit is skipped while its inputs
+# and outputs still match what was recorded, so an interrupted run resumes
+# at the first unit that was not finished.
+#
+# In-place stages (e.g. 3-delete_last_row) record the state they leave the
+# file in as its input, so a finished file is never processed twice.
+#
+# The manifest is an append-only log, <root>/.manifest_<stage>.jsonl, with one
+# line per finished unit (later lines win). Every record is flushed as soon
+# as the unit is done, so a crash loses at most the unit in progress.
+# compact() rewrites the log with one line per unit at the end of a run.
+# -------------------------------------------------------------------
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+def fast_hash(path, block_size=HASH_BLOCK_SIZE):
+    """Hash the first and last block of a file (plus its size)."""
+    digest = hashlib.blake2b(digest_size=16)
+    size = os.path.getsize(path)
+    digest.update(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(block_size))
+        if size > block_size:
+            f.seek(max(block_size, size - block_size))
+            digest.update(f.read(block_size))
+    return digest.hexdigest()
+
+
+def fingerprint(path, use_hash=False):
+    """Return [size, mtime_ns] (+ fast hash) of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    entry = [stat.st_size, stat.st_mtime_ns]
+    if use_hash:
+        entry.append(fast_hash(path))
+    return entry
+
+
+class StageManifest:
+    """Record of what one pipeline stage has already done under a root folder."""
+
+    def __init__(self, root, stage, use_hash=False, enabled=True):
+        self.root = root
+        self.use_hash = use_hash
+        self.enabled = enabled
+        self.path = os.path.join(root, f".manifest_{stage}.jsonl")
+        self.units = {}
+        if enabled and os.path.isfile(self.path):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.units[entry["unit"]] = entry
+
+    def _key(self, path):
+        try:
+            return os.path.relpath(path, self.root)
+        except ValueError:
+            return os.path.abspath(path)  # different drive on Windows
+
+    def _fingerprints(self, paths):
+        return {self._key(p): fingerprint(p, self.use_hash) for p in paths}
+
+    def is_done(self, unit, inputs, check_outputs=True):
+        """
+        True when unit was finished before and neither its inputs nor (with
+        check_outputs) its recorded outputs have changed since. Stages whose
+        outputs are consumed in place by a later stage pass check_outputs=False.
+        """
+        if not self.enabled:
+            return False
+        entry = self.units.get(self._key(unit))
+        if entry is None or entry["inputs"] != self._fingerprints(inputs):
+            return False
+        if not check_outputs:
+            return True
+        for key, recorded in entry["outputs"].items():
+            if fingerprint(os.path.join(self.root, key), self.use_hash) != recorded:
+                return False
+        return True
+
+    def record(self, unit, inputs, outputs=()):
+        """Mark unit as finished with the given input and output files."""
+        if not self.enabled:
+            return
+        entry = {
+            "unit": self._key(unit),
+            "inputs": self._fingerprints(inputs),
+            "outputs": self._fingerprints(outputs),
+        }
+        self.units[entry["unit"]] = entry
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def compact(self):
+        """Rewrite the log with only the latest record of each unit."""
+        if not self.enabled:
+            return
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as f:
+            for entry in self.units.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temp_path, self.path)
@@ -0,0 +1,186 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from csv_metadata import first_last_timestamps
+from event_store import open_recording
+from training_set import (ADL_CLASSES, CLASS_SETS, SENSOR_ORDER, WORKERS,
+                          allocate_array, list_events, save_training_set)
+
+# -------------------------------------------------------------------
+# Multi-rate resampling onto a common time grid.
+#
+# Phone (~500 Hz), watch (~100 Hz) and glass (~5 Hz) samples of an event
+# are linearly interpolated at the same timestamps: a grid of RATE_HZ
+# points starting where the last sensor of the event starts and spanning
+# DURATION_MS. Every event becomes one float32 (channels, samples) tensor,
+# channels = x, y, z of every sensor in order, so the sensors line up in
+# time instead of being cut to a fixed number of rows.
+#
+# Like training_set.py the builder
+#   1. lists the events and reads only the first/last timestamp of every
+#      source (events whose sensors overlap less than MIN_COVERAGE of the
+#      window are skipped),
+#   2. preallocates one (events, channels, samples) array,
+#   3. interpolates event by event on a thread pool, straight into it.
+# interpolate() does all channels of a recording with one searchsorted.
+# -------------------------------------------------------------------
+RATE_HZ = 100
+DURATION_MS = 4000
+MIN_COVERAGE = 0.9
+SIGNALS = "signals"
+
+
+def clean_timeline(t, values):
+    """
+    Sort a recording by time and drop rows with a missing value or a
+    repeated timestamp. t: (rows,), values: (channels, rows). Returns float64 copies.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(t) & ~np.isnan(values).any(axis=0)
+    t, values = t[valid], values[:, valid]
+    t, first = np.unique(t, return_index=True)  # sorted, first row of every timestamp
+    return t, values[:, first]
+
+
+def interpolate(t, values, grid):
+    """
+    Linear interpolation of every channel of values (channels, rows), sampled
+    at the increasing timestamps t, at the grid timestamps. Outside t the
+    first/last sample is held. Returns (channels, len(grid)).
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    if len(t) == 0:
+        return np.full((len(values), len(grid)), np.nan)
+    if len(t) == 1:
+        return np.repeat(values, len(grid), axis=1)
+    left = np.clip(np.searchsorted(t, grid, side='right') - 1, 0, len(t) - 2)
+    weight = np.clip((grid - t[left]) / (t[left + 1] - t[left]), 0.0, 1.0)
+    return values[:, left] * (1.0 - weight) + values[:, left + 1] * weight
+
+
+def time_grid(start, duration_ms=DURATION_MS, rate_hz=RATE_HZ):
+    """Timestamps (ms) of duration_ms of samples at rate_hz from start."""
+    n_samples = int(round(duration_ms * rate_hz / 1000.0))
+    return start + np.arange(n_samples) * (1000.0 / rate_hz)
+
+
+def read_source(source, event_num):
+    """(timestamps, values (3, rows)) of one sensor of an event, cleaned."""
+    kind, path = source
+    if kind == "store":
+        t, values = open_recording(path).event_arrays(event_num)
+    else:
+        df = pd.read_csv(path, header=None, delimiter=',')
+        xyz = df.iloc[:, 1:4] if df.shape[1] >= 4 else df.iloc[:, :3]
+        t = pd.to_numeric(df.iloc[:, 0], errors='coerce').to_numpy()
+        values = xyz.apply(pd.to_numeric, errors='coerce').to_numpy().T
+    return clean_timeline(t, values)
+
+
+def source_bounds(source, event_num):
+    """(first, last) timestamp of one sensor of an event, without parsing it."""
+    kind, path = source
+    if kind == "store":
+        recording = open_recording(path)
+        start, stop = recording.events[event_num]
+        return float(recording.timestamps[start]), float(recording.timestamps[stop - 1])
+    first, last = first_last_timestamps(path)
+    return (None, None) if first is None or last is None else (float(first), float(last))
+
+
+def scan_windows(base_path, classes=ADL_CLASSES, sensors=SENSOR_ORDER, duration_ms=DURATION_MS,
+                 min_coverage=MIN_COVERAGE, workers=WORKERS):
+    """
+    Pass 1: the events whose sensors overlap for at least min_coverage of
+    duration_ms. Returns a list of (subject, label, event_num, sources, start).
+    """
+    candidates = list_events(base_path, classes, sensors)
+
+    def window(candidate):
+        _, _, event_num, sources = candidate
+        bounds = [source_bounds(sources[sensor], event_num) for sensor in sensors]
+        if any(first is None for first, _ in bounds):
+            return None
+        start = max(first for first, _ in bounds)
+        end = min(last for _, last in bounds)
+        return start if end - start >= min_coverage * duration_ms else None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        starts = list(executor.map(window, candidates))
+    return [candidate + (start,) for candidate, start in zip(candidates, starts) if start is not None]
+
+
+def channel_names(sensors):
+    return [f"{sensor}_{axis}" for sensor in sensors for axis in "xyz"]
+
+
+def build_resampled_set(base_path, classes=ADL_CLASSES, sensors=SENSOR_ORDER, rate_hz=RATE_HZ,
+                        duration_ms=DURATION_MS, min_coverage=MIN_COVERAGE, output_path=None, workers=WORKERS):
+    """
+    Resample every qualifying event onto its time grid. Returns a dict
+    {"signals": (events, 3 * sensors, samples) float32, "channels": str,
+    "labels": int64, "subjects": str, "starts": float64 grid start in ms}.
+    Saved like training_set.save_training_set when output_path is given.
+    """
+    events = scan_windows(base_path, classes, sensors, duration_ms, min_coverage, workers)
+    print(f"{len(events)} qualifying events found.")
+    if output_path is not None and not output_path.endswith('.npz'):
+        os.makedirs(output_path, exist_ok=True)
+
+    n_samples = len(time_grid(0.0, duration_ms, rate_hz))
+    signals = allocate_array(output_path, SIGNALS, (len(events), 3 * len(sensors), n_samples), np.float32)
+
+    def fill(k):
+        _, _, event_num, sources, start = events[k]
+        grid = time_grid(start, duration_ms, rate_hz)
+        for i, sensor in enumerate(sensors):
+            t, values = read_source(sources[sensor], event_num)
+            signals[k, 3 * i:3 * i + 3] = interpolate(t, values, grid)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fill, range(len(events))))
+
+    arrays = {
+        SIGNALS: signals,
+        "channels": np.array(channel_names(sensors), dtype=str),
+        "labels": np.array([label for _, label, _, _, _ in events], dtype=np.int64),
+        "subjects": np.array([subject for subject, _, _, _, _ in events], dtype=str),
+        "starts": np.array([start for _, _, _, _, start in events], dtype=np.float64),
+    }
+    if output_path is not None:
+        save_training_set(arrays, output_path)
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resample every sensor of each event onto a common time grid.")
+    parser.add_argument("base_path", help="Dataset folder (<subject>/<activity>/<sensor>_eN.csv or .evt)")
+    parser.add_argument("output", help="Output .npz file, or a folder for memory-mappable .npy files")
+    parser.add_argument("--classes", choices=sorted(CLASS_SETS), default="adl",
+                        help="Label set: 30 ADL classes (default) or 8 fall classes")
+    parser.add_argument("--sensors", nargs="+", choices=SENSOR_ORDER, default=SENSOR_ORDER,
+                        help="Sensors to include, in channel order (default: all 9)")
+    parser.add_argument("--rate", type=float, default=RATE_HZ, help="Grid rate in Hz (default: 100)")
+    parser.add_argument("--duration", type=float, default=DURATION_MS, help="Window length in ms (default: 4000)")
+    parser.add_argument("--min-coverage", type=float, default=MIN_COVERAGE,
+                        help="Skip events whose sensors overlap less than this share of the window (default: 0.9)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Threads for reading (default: 8)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_path):
+        print("Directory does not exist.")
+        return
+    arrays = build_resampled_set(args.base_path, CLASS_SETS[args.classes], args.sensors, args.rate,
+                                 args.duration, args.min_coverage, args.output, args.workers)
+    print(f"  {SIGNALS}: {arrays[SIGNALS].shape} ({args.rate:g} Hz, {args.duration:g} ms)")
+    labels, counts = np.unique(arrays["labels"], return_counts=True)
+    print("Unique labels and counts:", labels, counts)
+    print(f"Resampled data saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from dataset_catalog import describe_file, walk_dataset
+
+# -------------------------------------------------------------------
+# Measured sample rates, instead of hard-coded SENSOR_RATES tables.
+#
+# Every CSV under a dataset root is profiled from its timestamp column
+# (vectorized np.diff): median rate, jitter (std of the sample interval),
+# gaps (intervals over GAP_FACTOR x the median), backwards steps and the
+# effective number of rows per 5 second window. Files are measured on a
+# process pool; the per-file results are cached in
+# <root>/.sample_rate_profile.json by size and mtime, so a re-run only
+# measures new or changed files.
+#
+# The per (device, sensor, subject) table is written to
+# <root>/sample_rates.csv. sensor_rates(root) returns {sensor: Hz} in the
+# shape of the notebooks' SENSOR_RATES, measured from the data.
+# -------------------------------------------------------------------
+PROFILE_NAME = ".sample_rate_profile.json"
+TABLE_NAME = "sample_rates.csv"
+WINDOW_MS = 5000
+GAP_FACTOR = 2.0
+WORKERS = None  # all cores
+
+TABLE_COLUMNS = ["device", "sensor", "subject", "files", "rows", "rate_hz", "jitter_ms",
+                 "gaps", "backwards", "rows_per_window", "min_rows_per_window"]
+
+
+def timestamp_stats(file_path, window_ms=WINDOW_MS, gap_factor=GAP_FACTOR):
+    """
+    Sample-interval statistics of one headerless sensor CSV, or None when it
+    has fewer than two valid timestamps.
+    """
+    try:
+        column = pd.read_csv(file_path, header=None, usecols=[0]).iloc[:, 0]
+    except (pd.errors.EmptyDataError, ValueError):
+        return None
+    ts = pd.to_numeric(column, errors='coerce').dropna().to_numpy(dtype=np.float64)
+    if len(ts) < 2:
+        return None
+    dt = np.diff(ts)
+    forward = dt[dt > 0]
+    if len(forward) == 0:
+        return None
+    median_dt = float(np.median(forward))
+    duration = float(ts[-1] - ts[0])
+    return {
+        "rows": int(len(ts)),
+        "duration_ms": duration,
+        "rate_hz": 1000.0 / median_dt,
+        "jitter_ms": float(np.std(forward)),
+        "gaps": int(np.count_nonzero(dt > gap_factor * median_dt)),
+        "backwards": int(np.count_nonzero(dt <= 0)),
+        "rows_per_window": (len(ts) - 1) * window_ms / duration if duration > 0 else None,
+    }
+
+
+def _load_profile(root):
+    path = os.path.join(root, PROFILE_NAME)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_profile(root, profile):
+    path = os.path.join(root, PROFILE_NAME)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(profile, f)
+    os.replace(path + ".tmp", path)
+
+
+def profile_dataset(root, workers=WORKERS, full=False, verbose=True):
+    """
+    Measure every CSV under root (only new or changed files unless full) and
+    return the per-file profile {rel_path: {"fingerprint": [size, mtime_ns], "stats": {...}}}.
+    """
+    cached = {} if full else _load_profile(root)
+    profile = {}
+    pending = []
+    for dirpath, _, files in walk_dataset(root):
+        for name, size, mtime_ns in files:
+            rel_path = os.path.relpath(os.path.join(dirpath, name), root)
+            if rel_path == TABLE_NAME:
+                continue
+            entry = cached.get(rel_path)
+            if entry is not None and entry["fingerprint"] == [size, mtime_ns]:
+                profile[rel_path] = entry
+            else:
+                pending.append((rel_path, [size, mtime_ns]))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        paths = [os.path.join(root, rel_path) for rel_path, _ in pending]
+        for (rel_path, fingerprint), stats in zip(pending, executor.map(timestamp_stats, paths, chunksize=16)):
+            profile[rel_path] = {"fingerprint": fingerprint, "stats": stats}
+
+    _save_profile(root, profile)
+    if verbose:
+        print(f"Profiled {len(pending)} new or changed files ({len(profile)} in total).")
+    return profile
+
+
+def rate_table(profile):
+    """Aggregate a per-file profile into the (device, sensor, subject) rate table."""
+    records = []
+    for rel_path, entry in profile.items():
+        stats = entry["stats"]
+        if not stats:
+            continue
+        device, subject, _, sensor, _ = describe_file(rel_path)
+        records.append({"device": device, "sensor": sensor, "subject": subject, **stats})
+    if not records:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+
+    files = pd.DataFrame(records).fillna({"device": "", "subject": ""})
+    table = files.groupby(["device", "sensor", "subject"]).agg(
+        files=("rows", "size"),
+        rows=("rows", "sum"),
+        rate_hz=("rate_hz", "median"),
+        jitter_ms=("jitter_ms", "median"),
+        gaps=("gaps", "sum"),
+        backwards=("backwards", "sum"),
+        rows_per_window=("rows_per_window", "median"),
+        min_rows_per_window=("rows_per_window", "min"),
+    ).reset_index()
+    return table[TABLE_COLUMNS]
+
+
+def refresh_rate_table(root, workers=WORKERS, full=False, verbose=True):
+    """Profile root (incrementally) and write <root>/sample_rates.csv. Returns the table."""
+    table = rate_table(profile_dataset(root, workers, full, verbose))
+    table.to_csv(os.path.join(root, TABLE_NAME), index=False)
+    return table
+
+
+def load_rate_table(root):
+    """The saved rate table of root, or None if the profiler has not been run there."""
+    path = os.path.join(root, TABLE_NAME)
+    if not os.path.isfile(path):
+        return None
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+
+def sensor_rates(root, fallback=None):
+    """
+    {sensor: rate in Hz} measured under root (median over subjects, rounded),
+    merged over fallback (e.g. a notebook's SENSOR_RATES) for sensors not seen.
+    """
+    rates = dict(fallback or {})
+    table = load_rate_table(root)
+    if table is not None and not table.empty:
+        for sensor, rate in table.groupby("sensor")["rate_hz"].median().items():
+            rates[sensor] = max(1, int(round(rate)))
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sample rates of every sensor CSV under a folder.")
+    parser.add_argument("root", help="Dataset root folder")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Worker processes (default: all cores)")
+    parser.add_argument("--full", action="store_true", help="Measure every file again, ignoring the cache")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print("Directory does not exist.")
+        return
+    table = refresh_rate_table(args.root, args.workers, args.full)
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"\nRate table written to {os.path.join(args.root, TABLE_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
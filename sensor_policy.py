@@ -0,0 +1,76 @@
+import os
+import json
+
+# -------------------------------------------------------------------
+# Which sensor streams the pipeline keeps.
+#
+# A policy is a deny list and an optional allow list of keywords matched
+# (case-insensitively, as substrings) against the structured file names,
+# e.g. phone_gyroscope_uncalibrated.csv. A file is kept when it matches no
+# deny keyword and, if an allow list is given, at least one allow keyword.
+# The default deny list is the one 7-delete_unwanted_files used to clean up
+# afterwards, so with it 4-Structured Data Code never copies those streams
+# and 5-convert to atomic never splits them.
+#
+# 4-Structured Data Code saves the policy it used in
+# <structured root>/.sensor_policy.json; 5-convert to atomic reads it from
+# there unless it is given its own --allow/--deny/--all-sensors.
+# -------------------------------------------------------------------
+POLICY_NAME = ".sensor_policy.json"
+DEFAULT_DENY = ['interrupt', 'calibrated', 'uncalibrated', 'gravity', 'linear_acceleration']
+
+
+class SensorPolicy:
+    """Allow/deny keyword filter for sensor file names."""
+
+    def __init__(self, allow=None, deny=DEFAULT_DENY):
+        self.allow = [keyword.lower() for keyword in allow] if allow else None
+        self.deny = [keyword.lower() for keyword in deny or ()]
+
+    def accepts(self, file_name):
+        """True when the sensor file should be kept."""
+        name = os.path.basename(file_name).lower()
+        if any(keyword in name for keyword in self.deny):
+            return False
+        return self.allow is None or any(keyword in name for keyword in self.allow)
+
+    def to_dict(self):
+        return {"allow": self.allow, "deny": self.deny}
+
+    def save(self, root):
+        with open(os.path.join(root, POLICY_NAME), 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, root):
+        """The policy saved under root, or the default policy if there is none."""
+        path = os.path.join(root, POLICY_NAME)
+        if not os.path.isfile(path):
+            return cls()
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data.get("allow"), data.get("deny"))
+
+
+def add_policy_arguments(parser):
+    """Add the --allow/--deny/--all-sensors options to an argparse parser."""
+    parser.add_argument("--allow", help="Comma-separated keywords; keep only sensor files matching one of them")
+    parser.add_argument("--deny", help="Comma-separated keywords of sensor files to drop "
+                                       f"(default: {','.join(DEFAULT_DENY)})")
+    parser.add_argument("--all-sensors", action="store_true", help="Keep every sensor file")
+
+
+def policy_from_args(args, root=None):
+    """
+    Build the policy from parsed arguments. Without any policy option the
+    policy saved under root (or the default) is used.
+    """
+    def keywords(value):
+        return [keyword.strip() for keyword in value.split(',') if keyword.strip()]
+
+    if args.all_sensors:
+        return SensorPolicy(deny=())
+    if args.allow is None and args.deny is None:
+        return SensorPolicy.load(root) if root else SensorPolicy()
+    return SensorPolicy(keywords(args.allow) if args.allow else None,
+                        keywords(args.deny) if args.deny is not None else DEFAULT_DENY)
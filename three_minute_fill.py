@@ -0,0 +1,223 @@
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# 3 minute activity filler (from "3 Minute Data filling more concise
+# way (1).ipynb").
+#
+# Every sensor file of the 3 minute activities is brought to exactly
+# TARGET_MS: longer files are cut, shorter ones (at least MIN_MS) are
+# extended by repeating the recording, and the last timestamp is set to
+# start + TARGET_MS. Files are rewritten in place and one report.csv row
+# per file is written to the base folder.
+#
+# Same results as the notebook, computed without Python loops over rows:
+#   - timestamp repair (t[i] = t[i-1] + eps where t[i] <= t[i-1]) scans whole
+#     runs of repaired timestamps at once (repair_timestamps),
+#   - the extension (the notebook doubled the frame with pd.concat until it
+#     was long enough) is one tiled array, since every copy it appended is the
+#     original shifted by a multiple of (span + mean interval),
+#   - activity folders are processed on a process pool (the files of one
+#     folder stay in one worker, in the notebook's order).
+# -------------------------------------------------------------------
+# Sensor keys as in the notebook (only the names are used here, to find the
+# files; the misspelled key is kept so the same files are picked)
+SENSOR_RATES = {
+    "glass_accelerometer": 5, "glass_gyroscope": 5, "glass_magnetometer": 5,
+    "phone_acceleromter_calibrated": 100, "phone_accelerometer": 500,
+    "phone_gravity": 200, "phone_linear_acceleration": 100,
+    "phone_gyroscope_uncalibrated": 500, "phone_gyroscope": 500,
+    "phone_magnetometer_uncalibrated": 100, "phone_magnetometer": 100,
+    "phone_interrupt_gyroscope": 100, "watch_accelerometer": 100,
+    "watch_gyroscope_uncalibrated": 200, "watch_linear_acceleration": 100,
+    "watch_gyroscope": 100, "watch_magnetometer_uncalibrated": 100,
+    "watch_magnetometer": 100, "watch_gravity": 100,
+}
+ALLOWED_ACTIVITIES = {
+    "quick_walk", "jogging", "laying", "reading", "sitting", "slow_walk", "standing",
+    "talk_using_phone", "typing", "walking", "clean_the_table"
+}
+TARGET_MS, MIN_MS, AVG_DELTA_N = 180_000, 10_000, 5
+REPORT_FILE = "report.csv"
+
+
+@dataclass
+class ReportRow:
+    file_path: str
+    sensor: str
+    original_rows: int
+    final_rows: int
+    orig_start: int
+    orig_end: int
+    final_start: int
+    final_end: int
+    action: str
+    warnings: str
+    dropped_rows: int
+    nan_rows: int
+    mismatch_rate: float
+
+
+def read_csv(path):
+    """Read t,x,y,z (timestamps in ms). Returns (df, dropped_rows, nan_rows)."""
+    df = pd.read_csv(path, header=None, usecols=[0, 1, 2, 3],
+                     names=["t", "x", "y", "z"], na_values=["", "NA", "nan"])
+    nan_rows = df.isna().any(axis=1).sum()
+    df = df.dropna(how="all")
+    # timestamp normalization
+    df["t"] = pd.to_numeric(df["t"], errors="coerce") * (1000 if df["t"].max() < 1e11 else 1)
+    df = df.dropna(subset=["t"])
+    df = df.astype({"t": "int64"})
+    df[["x", "y", "z"]] = df[["x", "y", "z"]].apply(pd.to_numeric, errors="coerce")
+    dropped_rows = len(df) - df.dropna().shape[0]
+    return df.dropna().reset_index(drop=True), dropped_rows, nan_rows
+
+
+def repair_timestamps(t, eps):
+    """
+    Vectorized form of the notebook's loop over a sorted timestamp array:
+    for i in 1..n-1, if t[i] <= t[i-1] then t[i] = t[i-1] + eps.
+    On sorted input a repair can only start at an equal neighbour, and then
+    continues as anchor + k*eps while the original timestamps stay at or below
+    that line, so each run is found with one vectorized scan instead of row by row.
+    """
+    t = t.copy()
+    n = len(t)
+    repaired_to = 0
+    for i in np.flatnonzero(t[1:] <= t[:-1]) + 1:
+        if i < repaired_to:
+            continue  # already part of the previous run
+        anchor = i - 1
+        end, window = i, 64
+        while end < n:
+            stop = min(n, end + window)
+            line = t[anchor] + (np.arange(end, stop) - 1 - anchor) * eps
+            above = np.flatnonzero(t[end:stop] > line)
+            if len(above):
+                end += above[0]
+                break
+            end, window = stop, window * 2
+        t[i:end] = t[anchor] + np.arange(i - anchor, end - anchor) * eps
+        repaired_to = end
+    return t
+
+
+def ensure_monotonic(df):
+    """
+    Sort by time and make timestamps strictly increasing: every timestamp not
+    above its predecessor becomes predecessor + eps. Returns (df, mismatch_rate).
+    """
+    diffs = np.diff(df["t"].to_numpy())
+    mismatch_rate = float((diffs <= 0).mean()) if len(diffs) else 0.0
+    eps = max(1, int(diffs[-AVG_DELTA_N:].mean() / 10)) if len(diffs) else 1
+    df = df.sort_values("t", kind="stable").reset_index(drop=True)
+    df["t"] = repair_timestamps(df["t"].to_numpy(), eps)
+    return df, mismatch_rate
+
+
+def extend_to_target(df):
+    """Repeat the recording after itself until it covers TARGET_MS, then cut at TARGET_MS."""
+    t = df["t"].to_numpy()
+    base, avg = t[0], int(np.diff(t).mean())
+    period = int(t[-1] - base) + avg
+    copies = TARGET_MS // period + 1 if period > 0 else 1
+
+    tiled_t = np.tile(t, copies) + np.repeat(np.arange(copies, dtype=np.int64) * period, len(t))
+    keep = tiled_t <= base + TARGET_MS
+    values = np.tile(df[["x", "y", "z"]].to_numpy(), (copies, 1))[keep]
+    return pd.DataFrame({"t": tiled_t[keep], "x": values[:, 0], "y": values[:, 1], "z": values[:, 2]})
+
+
+def finalize(df):
+    """Make the last timestamp exactly start + TARGET_MS (appending a copy of the last row if short)."""
+    desired = df["t"].iloc[0] + TARGET_MS
+    if df["t"].iloc[-1] < desired:
+        row = df.iloc[[-1]].copy()
+        row["t"] = desired
+        df = pd.concat([df, row], ignore_index=True)
+    df.loc[df.index[-1], "t"] = desired
+    return df
+
+
+def process_file(path, sensor, dry):
+    try:
+        df, dropped, nan_rows = read_csv(path)
+    except Exception as e:
+        return ReportRow(str(path), sensor, 0, 0, 0, 0, 0, 0, "read_failed", str(e), 0, 0, 0.0)
+    if df.empty:
+        return ReportRow(str(path), sensor, 0, 0, 0, 0, 0, 0, "empty", "", 0, 0, 0.0)
+
+    orig_rows, start, end = len(df), df["t"].iloc[0], df["t"].iloc[-1]
+    dur = end - start
+    if dur < MIN_MS:
+        return ReportRow(str(path), sensor, orig_rows, 0, start, end, 0, 0, "too_short", "", dropped, nan_rows, 0.0)
+    if dur > TARGET_MS:
+        df = df[df["t"] <= start + TARGET_MS]
+
+    df, mismatch_rate = ensure_monotonic(df)
+    if dur < TARGET_MS:
+        df = extend_to_target(df)
+    df = finalize(df)
+
+    final_rows = len(df)
+    warnings = []
+    if final_rows < orig_rows:
+        warnings.append("row_reduction")
+
+    if not dry:
+        df.to_csv(path, index=False, header=False)
+
+    return ReportRow(
+        str(path), sensor, orig_rows, final_rows, start, end,
+        int(df["t"].iloc[0]), int(df["t"].iloc[-1]),
+        "processed", ";".join(warnings), dropped, nan_rows, mismatch_rate
+    )
+
+
+def process_folder(folder, dry=False):
+    """Fill the first file of every sensor in one activity folder (in sensor order)."""
+    reports = []
+    files = sorted(folder.glob("*.csv"))
+    for sensor in SENSOR_RATES:
+        matches = [f for f in files if sensor in f.name.lower()]
+        if matches:
+            reports.append(process_file(matches[0], sensor, dry))
+    return reports
+
+
+def process_all(base, dry=False, workers=None):
+    """Fill every 3 minute activity folder under base and write base/report.csv."""
+    base = Path(base)
+    folders = sorted(folder for folder in base.rglob("*")
+                     if folder.is_dir() and folder.name in ALLOWED_ACTIVITIES)
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for folder_reports in executor.map(process_folder, folders, [dry] * len(folders)):
+            reports.extend(folder_reports)
+    df_report = pd.DataFrame([asdict(r) for r in reports])
+    df_report.to_csv(base / REPORT_FILE, index=False)
+    return df_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill every 3 minute activity recording to exactly 180 s.")
+    parser.add_argument("base_path", nargs="?", help="Dataset folder (prompted for if omitted)")
+    parser.add_argument("--dry-run", action="store_true", help="Only write the report, leave the files unchanged")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    base_path = args.base_path or input("Enter the dataset folder path: ").strip()
+    if not Path(base_path).is_dir():
+        print("Directory does not exist.")
+        return
+    report = process_all(base_path, args.dry_run, args.workers)
+    print(report["action"].value_counts().to_string() if not report.empty else "No files found.")
+    print(f"Report written to {Path(base_path) / REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
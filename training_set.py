@@ -0,0 +1,298 @@
+import os
+import re
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from csv_metadata import count_lines
+from event_store import STORE_SUFFIX, open_recording
+
+# -------------------------------------------------------------------
+# Training-set builder for the multi-input CNN-LSTM models.
+#
+# Replaces prep_data/load_data of the 4 second atomic notebook and its JSON
+# export. An event (<subject>/<activity>/<device>_<sensor>_eN.csv, or event
+# N of a <device>_<sensor>.evt recording) is used when every selected sensor
+# has it with at least the target number of samples. The builder
+#   1. walks the tree and counts the rows of every event (no parsing),
+#   2. preallocates one float32 array (events, 3, target_length) per sensor,
+#   3. fills the arrays in place, event by event, on a thread pool.
+# Row k of every array is the same event; labels[k] is its class and
+# subjects[k] its subject folder.
+#
+# With measured rates (--measured-rates) the per-second lengths come from the
+# sample_rates.csv of the dataset folder (sample_rates.py) instead of
+# TARGET_LENGTHS, for the sensors it has measured.
+#
+# Output is either <name>.npz or a folder of .npy files (one per array)
+# that np.load can memory-map. With a folder the arrays are written
+# straight into the mapped files, so building never holds the dataset in RAM.
+# -------------------------------------------------------------------
+SENSOR_ORDER = [
+    'glass_accelerometer',
+    'glass_gyroscope',
+    'glass_magnetometer',
+    'phone_accelerometer',
+    'phone_gyroscope',
+    'phone_magnetometer',
+    'watch_accelerometer',
+    'watch_gyroscope',
+    'watch_magnetometer'
+]
+
+# Samples per channel, before LENGTH_FACTOR (the notebook multiplied them by 4)
+TARGET_LENGTHS = {
+    'glass_accelerometer': 4,
+    'glass_gyroscope': 4,
+    'glass_magnetometer': 4,
+    'phone_accelerometer': 490,
+    'phone_gyroscope': 490,
+    'phone_magnetometer': 100,
+    'watch_accelerometer': 98,
+    'watch_gyroscope': 98,
+    'watch_magnetometer': 98
+}
+LENGTH_FACTOR = 4
+
+# (keywords that must all appear in the path, class); the first match wins
+ADL_CLASSES = [
+    (('bending',), 0),
+    (('clean_the_table',), 1),
+    (('close_door',), 2),
+    (('close_lid_by_rotation',), 3),
+    (('downstairs',), 4),
+    (('drink_water',), 5),
+    (('eat_small_thing',), 6),
+    (('standing_up_from_laying',), 7),
+    (('jogging',), 8),
+    (('laying_down_from_sitting',), 9),
+    (('standing_up_from_sitting',), 10),
+    (('open_bag',), 11),
+    (('open_big_box',), 12),
+    (('open_door',), 13),
+    (('pick_from_floor',), 14),
+    (('plugin',), 15),
+    (('put_on_floor',), 16),
+    (('reading',), 17),
+    (('sitting_down_from_standing',), 18),
+    (('sitting',), 19),
+    (('slow_walk',), 20),
+    (('squatting',), 21),
+    (('quick_walk',), 22),
+    (('laying',), 23),
+    (('standing',), 24),
+    (('talk_using_phone',), 25),
+    (('throw_out',), 26),
+    (('typing',), 27),
+    (('upstairs',), 28),
+    (('walking',), 29),
+]
+
+FALL_CLASSES = [
+    (('fall_backward', 'trying_to_sit_down'), 0),
+    (('fall_backward', 'trying_to_stand_up'), 1),
+    (('fall_backward',), 2),
+    (('fall_forward', 'trying_to_sit_down'), 3),
+    (('fall_forward', 'trying_to_stand_up'), 4),
+    (('fall_forward',), 5),
+    (('fall_left',), 6),
+    (('fall_right',), 7),
+]
+
+CLASS_SETS = {"adl": ADL_CLASSES, "fall": FALL_CLASSES}
+EVENT_PATTERN = re.compile(r'^(.*?)_e0*(\d+)\.csv$', re.IGNORECASE)
+WORKERS = 8
+
+
+def label_for(path, classes=ADL_CLASSES):
+    """Class of an activity path (e.g. 'sub1/walking'), or None if it has none."""
+    name = path.lower()
+    for keywords, cls in classes:
+        if all(keyword in name for keyword in keywords):
+            return cls
+    return None
+
+
+def target_length(sensor, lengths=TARGET_LENGTHS):
+    return lengths[sensor] * LENGTH_FACTOR
+
+
+def activity_sources(activity_folder, sensors):
+    """
+    Map every event of an activity folder to its sources:
+    {event_num: {sensor: ("csv", path) or ("store", store_path)}}.
+    """
+    events = {}
+    for entry in sorted(os.listdir(activity_folder)):
+        entry_path = os.path.join(activity_folder, entry)
+        lower = entry.lower()
+        if lower.endswith(STORE_SUFFIX) and os.path.isdir(entry_path):
+            sensor = next((s for s in sensors if s in lower), None)
+            if sensor is None:
+                continue
+            for event_num in open_recording(entry_path).event_numbers():
+                events.setdefault(event_num, {})[sensor] = ("store", entry_path)
+            continue
+        match = EVENT_PATTERN.match(entry)
+        if match is None:
+            continue
+        sensor = next((s for s in sensors if s in lower), None)
+        if sensor is not None:
+            events.setdefault(int(match.group(2)), {})[sensor] = ("csv", entry_path)
+    return events
+
+
+def _source_rows(source, event_num):
+    kind, path = source
+    if kind == "store":
+        start, stop = open_recording(path).events[event_num]
+        return stop - start
+    return count_lines(path)
+
+
+def list_events(base_path, classes=ADL_CLASSES, sensors=SENSOR_ORDER):
+    """
+    Every labelled event that has all sensors, in a stable order (subject,
+    activity, event number): a list of (subject, label, event_num, {sensor: source}).
+    """
+    candidates = []
+    for subject in sorted(os.listdir(base_path)):
+        subject_folder = os.path.join(base_path, subject)
+        if not os.path.isdir(subject_folder):
+            continue
+        for activity in sorted(os.listdir(subject_folder)):
+            activity_folder = os.path.join(subject_folder, activity)
+            if not os.path.isdir(activity_folder):
+                continue
+            label = label_for(os.path.join(subject, activity), classes)
+            if label is None:
+                continue
+            for event_num, sources in sorted(activity_sources(activity_folder, sensors).items()):
+                if all(sensor in sources for sensor in sensors):
+                    candidates.append((subject, label, event_num, sources))
+    return candidates
+
+
+def scan_events(base_path, classes=ADL_CLASSES, sensors=SENSOR_ORDER, workers=WORKERS, lengths=TARGET_LENGTHS):
+    """
+    Pass 1: list the qualifying events (list_events with at least the target
+    number of samples of every sensor).
+    """
+    candidates = list_events(base_path, classes, sensors)
+
+    # Row counts decide the rest; counting newlines never parses the files
+    def long_enough(candidate):
+        _, _, event_num, sources = candidate
+        return all(_source_rows(sources[sensor], event_num) >= target_length(sensor, lengths) for sensor in sensors)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        keep = list(executor.map(long_enough, candidates))
+    return [candidate for candidate, ok in zip(candidates, keep) if ok]
+
+
+def _read_samples(source, event_num, n_samples, out):
+    """Pass 2: copy the first n_samples x/y/z of one event into out (3, n_samples)."""
+    kind, path = source
+    if kind == "store":
+        open_recording(path).gather([event_num], n_samples, out[np.newaxis])
+        return
+    df = pd.read_csv(path, header=None, delimiter=',', nrows=n_samples)
+    xyz = df.iloc[:, 1:4] if df.shape[1] >= 4 else df.iloc[:, :3]
+    out[:] = xyz.to_numpy(dtype=np.float32).T
+
+
+def allocate_array(output_path, name, shape, dtype):
+    if output_path is not None and not output_path.endswith('.npz'):
+        return np.lib.format.open_memmap(os.path.join(output_path, f"{name}.npy"), mode='w+',
+                                         dtype=dtype, shape=shape)
+    return np.empty(shape, dtype=dtype)
+
+
+def build_training_set(base_path, classes=ADL_CLASSES, sensors=SENSOR_ORDER, output_path=None, workers=WORKERS,
+                       lengths=TARGET_LENGTHS):
+    """
+    Build the training arrays of a structured dataset folder. Returns a dict
+    {sensor: (events, 3, target_length) float32, "labels": int64, "subjects": str}.
+    With output_path the arrays are also saved (see save_training_set); a
+    folder output is filled in place through memory-mapped .npy files.
+    """
+    events = scan_events(base_path, classes, sensors, workers, lengths)
+    print(f"{len(events)} qualifying events found.")
+    if output_path is not None and not output_path.endswith('.npz'):
+        os.makedirs(output_path, exist_ok=True)
+
+    arrays = {sensor: allocate_array(output_path, sensor, (len(events), 3, target_length(sensor, lengths)), np.float32)
+              for sensor in sensors}
+
+    def fill(k):
+        _, _, event_num, sources = events[k]
+        for sensor in sensors:
+            _read_samples(sources[sensor], event_num, target_length(sensor, lengths), arrays[sensor][k])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fill, range(len(events))))
+
+    arrays["labels"] = np.array([label for _, label, _, _ in events], dtype=np.int64)
+    arrays["subjects"] = np.array([subject for subject, _, _, _ in events], dtype=str)
+    if output_path is not None:
+        save_training_set(arrays, output_path)
+    return arrays
+
+
+def save_training_set(arrays, output_path):
+    """Save as <output_path>.npz, or as one .npy per array in the folder output_path."""
+    if output_path.endswith('.npz'):
+        np.savez(output_path, **arrays)
+        return
+    os.makedirs(output_path, exist_ok=True)
+    for name, array in arrays.items():
+        if isinstance(array, np.memmap):
+            array.flush()  # already written in place
+        else:
+            np.save(os.path.join(output_path, f"{name}.npy"), array)
+
+
+def load_training_set(path, mmap=True):
+    """
+    Load a saved training set as a dict of arrays. A .npy folder is opened
+    memory-mapped (mmap=True), so nothing is read until the arrays are used.
+    """
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    return {os.path.splitext(name)[0]: np.load(os.path.join(path, name), mmap_mode='r' if mmap else None)
+            for name in sorted(os.listdir(path)) if name.endswith('.npy')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build NumPy training arrays from a structured event dataset.")
+    parser.add_argument("base_path", help="Dataset folder (<subject>/<activity>/<sensor>_eN.csv or .evt)")
+    parser.add_argument("output", help="Output .npz file, or a folder for memory-mappable .npy files")
+    parser.add_argument("--classes", choices=sorted(CLASS_SETS), default="adl",
+                        help="Label set: 30 ADL classes (default) or 8 fall classes")
+    parser.add_argument("--sensors", nargs="+", choices=SENSOR_ORDER, default=SENSOR_ORDER,
+                        help="Sensors to include, in model input order (default: all 9)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Threads for reading (default: 8)")
+    parser.add_argument("--measured-rates", action="store_true",
+                        help="Use the rates measured by sample_rates.py in the dataset folder as per-second lengths")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_path):
+        print("Directory does not exist.")
+        return
+    lengths = TARGET_LENGTHS
+    if args.measured_rates:
+        from sample_rates import sensor_rates
+        lengths = sensor_rates(args.base_path, TARGET_LENGTHS)
+    arrays = build_training_set(args.base_path, CLASS_SETS[args.classes], args.sensors, args.output, args.workers,
+                                lengths)
+    for name, array in arrays.items():
+        print(f"  {name:25s}: {array.shape}")
+    labels, counts = np.unique(arrays["labels"], return_counts=True)
+    print("Unique labels and counts:", labels, counts)
+    print(f"Training data saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()